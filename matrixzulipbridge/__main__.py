@@ -33,7 +33,7 @@ import string
 import sys
 import urllib
 from fnmatch import fnmatch
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from mautrix.api import HTTPAPI, Method, Path, SynapseAdminPath
 from mautrix.appservice import AppService as MauService
@@ -72,6 +72,13 @@ if TYPE_CHECKING:
 
     from matrixzulipbridge.types import ZulipUserID
 
+# characters that are not allowed in a puppet localpart
+_MXID_INVALID_CHARS = re.compile(r"[^0-9a-z\-\.=\_/]")
+
+
+def _escape_mxid_char(m: re.Match) -> str:
+    return "=" + m.group(0).encode("utf-8").hex()
+
 
 class MemoryBridgeStateStore(ASStateStore, MemoryStateStore):
     def __init__(self) -> None:
@@ -82,6 +89,7 @@ class MemoryBridgeStateStore(ASStateStore, MemoryStateStore):
 class BridgeAppService(AppService):
     _api: HTTPAPI
     _rooms: dict[str, Room]
+    _rooms_by_type: dict[str, dict[str, Room]]
     _users: dict[str, str]
 
     DEFAULT_MEDIA_PATH = "/_matrix/media/v3/download/{netloc}{path}{filename}"
@@ -93,6 +101,8 @@ class BridgeAppService(AppService):
         self.registration = None
         self.puppet_separator = None
         self.puppet_prefix = None
+        self.puppet_mxid_prefix = None
+        self.local_suffix = None
         self.api = None
         self.synapse_admin = None
         self.endpoint = None
@@ -128,26 +138,33 @@ class BridgeAppService(AppService):
         )
 
     def register_room(self, room: Room):
+        # drop a previous room object with the same id from the type index
+        self.unregister_room(room.id)
         self._rooms[room.id] = room
+        self._rooms_by_type.setdefault(room.__class__.__name__, {})[room.id] = room
 
     def unregister_room(self, room_id: "RoomID"):
         if room_id in self._rooms:
-            del self._rooms[room_id]
+            room = self._rooms.pop(room_id)
+            self._rooms_by_type[room.__class__.__name__].pop(room_id, None)
 
-    # this is mostly used by organization rooms at init, it's a bit slow
+    # this is mostly used by organization rooms at init
     def find_rooms(
         self, rtype=None, user_id: "UserID" = None, organization_id: "RoomID" = None
     ) -> list[Room]:
         ret = []
 
-        if rtype is not None and not isinstance(rtype, str):
-            rtype = rtype.__name__
-
-        for room in self._rooms.values():
-            if (
-                (rtype is None or room.__class__.__name__ == rtype)
-                and (user_id is None or room.user_id == user_id)
-                and (organization_id is None or room.organization_id == organization_id)
+        if rtype is None:
+            rooms = self._rooms
+        else:
+            if not isinstance(rtype, str):
+                rtype = rtype.__name__
+            # only scan rooms of the requested type
+            rooms = self._rooms_by_type.get(rtype, {})
+
+        for room in rooms.values():
+            if (user_id is None or room.user_id == user_id) and (
+                organization_id is None or room.organization_id == organization_id
             ):
                 ret.append(room)
 
@@ -174,7 +191,7 @@ class BridgeAppService(AppService):
         return False
 
     def is_local(self, mxid: "UserID"):
-        return mxid.endswith(":" + self.server_name)
+        return mxid.endswith(self.local_suffix)
 
     def is_puppet(self, mxid: "UserID") -> bool:
         """Checks whether a given MXID is our puppet
@@ -185,7 +202,9 @@ class BridgeAppService(AppService):
         Returns:
             bool:
         """
-        return mxid.startswith("@" + self.puppet_prefix) and self.is_local(mxid)
+        return mxid.startswith(self.puppet_mxid_prefix) and mxid.endswith(
+            self.local_suffix
+        )
 
     def get_mxid_from_zulip_user_id(
         self,
@@ -194,9 +213,8 @@ class BridgeAppService(AppService):
         at=True,
         server=True,
     ) -> "UserID":
-        ret = re.sub(
-            r"[^0-9a-z\-\.=\_/]",
-            lambda m: "=" + m.group(0).encode("utf-8").hex(),
+        ret = _MXID_INVALID_CHARS.sub(
+            _escape_mxid_char,
             f"{self.puppet_prefix}{organization.name}{self.puppet_separator}{zulip_user_id}".lower(),
         )
         # ret = f"{self.puppet_prefix}{organization.site}{self.puppet_separator}{zulip_user_id}".lower()
@@ -205,7 +223,7 @@ class BridgeAppService(AppService):
             ret = "@" + ret
 
         if server:
-            ret += ":" + self.server_name
+            ret += self.local_suffix
 
         return ret
 
@@ -247,7 +265,7 @@ class BridgeAppService(AppService):
 
         # always ensure the displayname is up-to-date
         if update_cache:
-            zulip_user = organization.get_zulip_user(zulip_user_id)
+            zulip_user = await organization.get_zulip_user(zulip_user_id)
             await self.cache_user(mx_user_id, zulip_user["full_name"])
 
         return mx_user_id
@@ -275,9 +293,7 @@ class BridgeAppService(AppService):
             and event.content.membership == Membership.INVITE
         ):
             # set owner if we have none and the user is from the same HS
-            if self.config.get("owner", None) is None and event.sender.endswith(
-                ":" + self.server_name
-            ):
+            if self.config.get("owner", None) is None and self.is_local(event.sender):
                 logging.info(f"We have an owner now, let us rejoice, {event.sender}!")
                 self.config["owner"] = event.sender
                 await self.save()
@@ -344,8 +360,7 @@ class BridgeAppService(AppService):
                 # show help on open
                 await room.show_help()
             except Exception:
-                if event.room_id in self._rooms:
-                    del self._rooms[event.room_id]
+                self.unregister_room(event.room_id)
                 logging.exception("Failed to create control room.")
         else:
             pass
@@ -401,6 +416,7 @@ class BridgeAppService(AppService):
         whoami = await api.request(Method.GET, Path.v3.account.whoami)
         self.user_id = whoami["user_id"]
         self.server_name = self.user_id.split(":", 1)[1]
+        self.local_suffix = ":" + self.server_name
         logging.info("We are " + whoami["user_id"])
 
         self.az = MauService(
@@ -436,13 +452,11 @@ class BridgeAppService(AppService):
         with open(config_file, encoding="utf-8") as f:
             self.registration = yaml.load(f)
 
-    async def leave_room(self, room_id: "RoomID", members: list["UserID"]):
+    async def leave_room(self, room_id: "RoomID", members: Iterable["UserID"]):
         members = members if members else []
 
         for member in members:
-            (name, server) = member.split(":", 1)
-
-            if name.startswith("@" + self.puppet_prefix) and server == self.server_name:
+            if self.is_puppet(member):
                 try:
                     await self.az.intent.user(member).leave_room(room_id)
                 except Exception:
@@ -507,6 +521,7 @@ class BridgeAppService(AppService):
 
         self.puppet_separator = m.group(2)
         self.puppet_prefix = m.group(1) + self.puppet_separator
+        self.puppet_mxid_prefix = "@" + self.puppet_prefix
 
         logging.info(f"zulipbridge v{__version__}")
         if unsafe_mode:
@@ -565,6 +580,7 @@ class BridgeAppService(AppService):
 
         self.user_id = whoami["user_id"]
         self.server_name = self.user_id.split(":", 1)[1]
+        self.local_suffix = ":" + self.server_name
 
         self.az = MauService(
             id=self.registration["id"],
@@ -605,6 +621,7 @@ class BridgeAppService(AppService):
                 logging.warning(f"Failed to set displayname: {str(e)}")
 
         self._rooms = {}
+        self._rooms_by_type = {}
         self._users = {}
         self.config = {
             "organizations": {},
@@ -764,7 +781,7 @@ class BridgeAppService(AppService):
 
                 # only add valid rooms to event handler
                 if room.is_valid():
-                    self._rooms[room_id] = room
+                    self.register_room(room)
                 else:
                     room.cleanup()
                     raise Exception("Room validation failed after init")
@@ -23,7 +23,7 @@
 #
 import logging
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from mautrix.api import Method, Path
 from mautrix.errors import MNotFound
@@ -34,6 +34,9 @@ if TYPE_CHECKING:
 
     from matrixzulipbridge.room import Room
 
+# room versions that don't support restricted join rules
+PRE_RESTRICTED_ROOM_VERSIONS = frozenset(str(v) for v in range(1, 9))
+
 
 class AppService(ABC):
     az: "MauService"
@@ -42,6 +45,9 @@ class AppService(ABC):
     server_name: str
     config: dict
 
+    _default_room_version: Optional[str] = None
+    _default_room_version_fetched: bool = False
+
     async def load(self):
         try:
             self.config.update(await self.az.intent.get_account_data("zulip"))
@@ -51,6 +57,29 @@ class AppService(ABC):
     async def save(self):
         await self.az.intent.set_account_data("zulip", self.config)
 
+    async def get_default_room_version(self) -> Optional[str]:
+        """Get the homeserver's default room version
+
+        Capabilities don't change while we are running, so this is only
+        requested once.
+
+        Returns:
+            Optional[str]: default room version, None if the reply was unexpected
+        """
+        if self._default_room_version_fetched:
+            return self._default_room_version
+
+        resp = await self.az.intent.api.request(Method.GET, Path.v3.capabilities)
+        try:
+            self._default_room_version = resp["capabilities"]["m.room_versions"][
+                "default"
+            ]
+        except KeyError:
+            logging.debug("Unexpected capabilities reply")
+            self._default_room_version = None
+        self._default_room_version_fetched = True
+        return self._default_room_version
+
     async def create_room(
         self,
         name: str,
@@ -87,15 +116,10 @@ class AppService(ABC):
         }
 
         if restricted is not None:
-            resp = await self.az.intent.api.request(Method.GET, Path.v3.capabilities)
-            try:
-                def_ver = resp["capabilities"]["m.room_versions"]["default"]
-            except KeyError:
-                logging.debug("Unexpected capabilities reply")
-                def_ver = None
+            def_ver = await self.get_default_room_version()
 
             # If room version is in range of 1..8, request v9
-            if def_ver in [str(v) for v in range(1, 9)]:
+            if def_ver in PRE_RESTRICTED_ROOM_VERSIONS:
                 req["room_version"] = "9"
 
             req["initial_state"] = [
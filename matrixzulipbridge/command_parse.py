@@ -23,8 +23,12 @@
 #
 import argparse
 import shlex
+import string
 from typing import Awaitable
 
+# characters shlex would split exactly like str.split
+_PLAIN_CHARS = frozenset(string.printable) - frozenset("'\"\\;\x0b\x0c")
+
 
 class CommandParserFormatter(
     argparse.ArgumentDefaultsHelpFormatter, argparse.RawTextHelpFormatter
@@ -58,6 +62,11 @@ class CommandParser(argparse.ArgumentParser):
 
 
 def split(text):
+    # plain commands need no quoting or ";" handling, skip the tokenizer
+    if _PLAIN_CHARS.issuperset(text):
+        args = text.split()
+        return [args] if args else []
+
     commands = []
 
     sh_split = shlex.shlex(text, posix=True, punctuation_chars=";")
@@ -202,12 +202,9 @@ class ControlRoom(Room):
             return
 
         try:
-            lines = event.content.body.split("\n")
+            command, sep, tail = event.content.body.partition("\n")
 
-            command = lines.pop(0)
-            tail = "\n".join(lines) if len(lines) > 0 else None
-
-            await self.commands.trigger(command, tail)
+            await self.commands.trigger(command, tail if sep else None)
         except CommandParserError as e:
             self.send_notice(str(e))
 
@@ -255,10 +252,12 @@ class ControlRoom(Room):
             "organizations"
         ]
 
-        self.send_notice("Configured organizations:")
+        msg = "Configured organizations:\n"
 
         for _, data in organizations.items():
-            self.send_notice(f"\t{data}")
+            msg += f"\t{data}\n"
+
+        self.send_notice(msg)
 
     async def cmd_addorganization(self, args):
         organizations = self.organizations()
@@ -377,13 +376,14 @@ class ControlRoom(Room):
         idents = self.serv.config["idents"]
 
         if args.cmd == "list" or args.cmd is None:
-            self.send_notice("Configured custom idents:")
+            msg = "Configured custom idents:\n"
             for mxid, ident in idents.items():
-                self.send_notice(f"\t{mxid} -> {ident}")
+                msg += f"\t{mxid} -> {ident}\n"
+            self.send_notice(msg)
         elif args.cmd == "set":
             if not re.match(r"^[a-z][-a-z0-9]*$", args.ident):
-                self.send_notice(f"Invalid ident string: {args.ident}")
                 self.send_notice(
+                    f"Invalid ident string: {args.ident}\n"
                     "Must be lowercase, start with a letter, can contain dashes, letters and numbers."
                 )
             else:
@@ -50,11 +50,15 @@ if TYPE_CHECKING:
     from matrixzulipbridge.organization_room import OrganizationRoom
     from matrixzulipbridge.types import ZulipMessageID, ZulipUserID
 
+# non-media message types that get relayed to Zulip
+RELAYED_MSGTYPES = frozenset((MessageType.EMOTE, MessageType.TEXT, MessageType.NOTICE))
+
 
 class DirectRoom(UnderOrganizationRoom):
     name: str
     media: list[list[str]]
     recipient_ids: list["ZulipUserID"]
+    recipient_key: frozenset["ZulipUserID"]
     max_backfill_amount: int
     lazy_members: dict
     messages: bidict["ZulipMessageID", "EventID"]
@@ -68,6 +72,7 @@ class DirectRoom(UnderOrganizationRoom):
         self.name = None
         self.media = []
         self.recipient_ids = []
+        self.recipient_key = frozenset()
         self.max_backfill_amount = None
         self.messages = bidict()
         self.reactions = bidict()
@@ -102,6 +107,7 @@ class DirectRoom(UnderOrganizationRoom):
 
         if "recipient_ids" in config:
             self.recipient_ids = config["recipient_ids"]
+            self.recipient_key = frozenset(self.recipient_ids)
 
         if "messages" in config and config["messages"]:
             self.messages = bidict(config["messages"])
@@ -115,16 +121,19 @@ class DirectRoom(UnderOrganizationRoom):
             )
 
     def to_config(self) -> dict:
-        return {
-            **(super().to_config()),
-            "name": self.name,
-            "organization_id": self.organization_id,
-            "media": self.media[:5],
-            "max_backfill_amount": self.max_backfill_amount,
-            "recipient_ids": self.recipient_ids,
-            "messages": dict(self.messages),
-            "reactions": {k: list(v) for k, v in self.reactions.items()},
-        }
+        config = super().to_config()
+        config.update(
+            {
+                "name": self.name,
+                "organization_id": self.organization_id,
+                "media": self.media[:5],
+                "max_backfill_amount": self.max_backfill_amount,
+                "recipient_ids": self.recipient_ids,
+                "messages": dict(self.messages),
+                "reactions": {k: list(v) for k, v in self.reactions.items()},
+            }
+        )
+        return config
 
     @staticmethod
     async def create(
@@ -161,13 +170,13 @@ class DirectRoom(UnderOrganizationRoom):
         room.max_backfill_amount = organization.max_backfill_amount
 
         room.recipient_ids = [user["id"] for user in zulip_recipients]
+        room.recipient_key = frozenset(room.recipient_ids)
 
         organization.serv.register_room(room)
 
-        recipient_ids = frozenset(room.recipient_ids)
-        organization.direct_rooms[recipient_ids] = room
+        organization.direct_rooms[room.recipient_key] = room
 
-        asyncio.ensure_future(room.create_mx(mx_recipients))
+        asyncio.get_running_loop().create_task(room.create_mx(mx_recipients))
         return room
 
     async def create_mx(self, user_mxids: list["UserID"]) -> None:
@@ -254,24 +263,17 @@ class DirectRoom(UnderOrganizationRoom):
         await self.check_if_nobody_left()
 
         sender = str(event.sender)
-        (name, server) = sender.split(":", 1)
 
         # ignore self messages
         if sender == self.serv.user_id:
             return
 
         # prevent re-sending federated messages back
-        if (
-            name.startswith("@" + self.serv.puppet_prefix)
-            and server == self.serv.server_name
-        ):
+        if self.serv.is_puppet(sender):
             return
 
-        if event.content.msgtype.is_media or event.content.msgtype in (
-            MessageType.EMOTE,
-            MessageType.TEXT,
-            MessageType.NOTICE,
-        ):
+        msgtype = event.content.msgtype
+        if msgtype.is_media or msgtype in RELAYED_MSGTYPES:
             await self._relay_message(event)
 
         await self.az.intent.send_receipt(event.room_id, event.event_id)
@@ -281,18 +283,25 @@ class DirectRoom(UnderOrganizationRoom):
         event_id = event.redacts
 
         client = self.organization.zulip_puppets.get(event.sender)
+        # This only works for logged in users
+        if not client:
+            return
 
-        if event_id in self.messages.inverse:
-            zulip_message_id = self.messages.inverse[event_id]
-            result = client.delete_message(zulip_message_id)
-            del self.messages.inverse[event_id]
+        zulip_message_id = self.messages.inverse.get(event_id)
+        if zulip_message_id is not None:
+            result = await self.organization.zulip_call(
+                client.delete_message, zulip_message_id
+            )
+            # keep the mapping when Zulip refused so the redaction can be retried
+            if result["result"] == "success":
+                self.messages.inverse.pop(event_id, None)
         elif event_id in self.reactions:
             reaction = {i[0]: i[1] for i in self.reactions[event_id]}
             request = {
                 "message_id": reaction["message_id"],
                 "emoji_name": reaction["emoji_name"],
             }
-            result = client.remove_reaction(request)
+            result = await self.organization.zulip_call(client.remove_reaction, request)
             zulip_user_id = self.organization.zulip_puppet_user_mxid.inverse[
                 event.sender
             ]
@@ -337,7 +346,7 @@ class DirectRoom(UnderOrganizationRoom):
             "emoji_name": emoji_name,
         }
 
-        result = client.add_reaction(request)
+        result = await self.organization.zulip_call(client.add_reaction, request)
         if result["result"] != "success":
             logging.debug(f"Failed adding reaction {emoji_name} to {zulip_message_id}!")
             return
@@ -349,6 +358,24 @@ class DirectRoom(UnderOrganizationRoom):
             del self.reactions.inverse[frozen_request]
         self.reactions[event.event_id] = frozen_request
 
+    async def _get_reply_to(self, event: "MessageEvent") -> Optional["MessageEvent"]:
+        if not event.content.get_reply_to():
+            return None
+
+        rel_event = event
+
+        # traverse back all edits
+        while rel_event.content.get_edit():
+            rel_event = await self.az.intent.get_event(
+                self.id, rel_event.content.get_edit()
+            )
+
+        # see if the original is a reply
+        if not rel_event.content.get_reply_to():
+            return None
+
+        return await self.az.intent.get_event(self.id, rel_event.content.get_reply_to())
+
     async def _relay_message(self, event: "MessageEvent"):
         prefix = ""
         client = self.organization.zulip_puppets.get(event.sender)
@@ -359,21 +386,7 @@ class DirectRoom(UnderOrganizationRoom):
             return
 
         # try to find out if this was a reply
-        reply_to = None
-        if event.content.get_reply_to():
-            rel_event = event
-
-            # traverse back all edits
-            while rel_event.content.get_edit():
-                rel_event = await self.az.intent.get_event(
-                    self.id, rel_event.content.get_edit()
-                )
-
-            # see if the original is a reply
-            if rel_event.content.get_reply_to():
-                reply_to = await self.az.intent.get_event(
-                    self.id, rel_event.content.get_reply_to()
-                )
+        reply_to = await self._get_reply_to(event)
 
         # keep track of the last message
         self.last_messages[event.sender] = event
@@ -385,37 +398,38 @@ class DirectRoom(UnderOrganizationRoom):
             "content": message,
         }
 
-        result = client.send_message(request)
+        result = await self.organization.zulip_call(client.send_message, request)
         if result["result"] != "success":
             logging.error(f"Failed sending message to Zulip: {result['msg']}")
             return
 
         self.messages[str(result["id"])] = event.event_id
-        await self.organization.save()
-        await self.save()
+        self.organization.save_later()
+        self.save_later()
 
-    async def _flush_event(self, event: dict):
-        if event["type"] == "_zulip_react":
-            intent = self.az.intent.user(event["user_id"])
-            message_event_id = event["event_id"]
+    async def _flush_zulip_react(self, event: dict):
+        intent = self._get_intent(event["user_id"])
+        message_event_id = event["event_id"]
 
-            request = {
-                "message_id": event["zulip_message_id"],
-                "emoji_name": event["zulip_emoji_name"],
-                "user_id": event["zulip_user_id"],
-            }
-            frozen_request = frozenset(request.items())
+        request = {
+            "message_id": event["zulip_message_id"],
+            "emoji_name": event["zulip_emoji_name"],
+            "user_id": event["zulip_user_id"],
+        }
+        frozen_request = frozenset(request.items())
 
-            # Check if this reaction has already been relayed
-            if self.reactions.inverse.get(frozen_request) is not None:
-                return
+        # Check if this reaction has already been relayed
+        if self.reactions.inverse.get(frozen_request) is not None:
+            return
 
-            event_id = await intent.react(self.id, message_event_id, event["key"])
+        event_id = await intent.react(self.id, message_event_id, event["key"])
 
-            self.reactions[event_id] = frozen_request
-            await self.save()
-        else:
-            await super()._flush_event(event)
+        self.reactions[event_id] = frozen_request
+        self.save_later()
+
+    _FLUSH_HANDLERS = UnderOrganizationRoom._FLUSH_HANDLERS | {
+        "_zulip_react": _flush_zulip_react,
+    }
 
     def relay_zulip_react(
         self,
@@ -480,18 +494,19 @@ class DirectRoom(UnderOrganizationRoom):
         if client is None:
             return
 
-        result = client.get_messages(request)
+        result = await self.organization.zulip_call(client.get_messages, request)
 
         if result["result"] != "success":
             logging.error(f"Failed getting Zulip messages: {result['msg']}")
             return
 
+        organization = self.organization
+        backfill = organization.dm_message
         for message in result["messages"]:
-            if str(message["id"]) in self.messages:
-                continue
-            if str(message["id"]) in self.organization.messages:
+            message_id = str(message["id"])
+            if message_id in self.messages or message_id in organization.messages:
                 continue
-            self.organization.dm_message(message)
+            backfill(message)
 
     def get_any_zulip_client(self) -> "zulip.Client":
         for recipient_id in self.recipient_ids:
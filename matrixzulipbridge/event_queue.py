@@ -26,12 +26,16 @@ import logging
 
 
 class EventQueue:
-    def __init__(self, callback):
+    def __init__(self, callback, delay=0.1, max_wait=0.5, max_size=100):
         self._callback = callback
+        self._delay = delay
+        self._max_wait = max_wait
+        self._max_size = max_size
         self._events = []
         self._loop = asyncio.get_running_loop()
         self._timer = None
         self._start = 0
+        self._last = 0
         self._chain = asyncio.Queue()
         self._task = None
         self._timeout = 3600
@@ -66,26 +70,36 @@ class EventQueue:
     def _flush(self):
         events = self._events
 
-        self._timer = None
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
         self._events = []
 
         self._chain.put_nowait(self._callback(events))
 
+    def _on_timer(self):
+        self._timer = None
+
+        # events kept arriving since the timer was armed, wait for them to settle
+        deadline = min(self._last + self._delay, self._start + self._max_wait)
+        if self._loop.time() < deadline:
+            self._timer = self._loop.call_at(deadline, self._on_timer)
+        else:
+            self._flush()
+
     def enqueue(self, event):
         now = self._loop.time()
 
-        # always cancel timer when we enqueue
-        if self._timer:
-            self._timer.cancel()
-
         # stamp start time when we queue first event, always append event
         if len(self._events) == 0:
             self._start = now
 
         self._events.append(event)
+        self._last = now
 
-        # if we have bumped ourself for half a second, flush now
-        if now >= self._start + 0.5:
+        # if we have bumped ourself for too long or the batch is full, flush now
+        if now >= self._start + self._max_wait or len(self._events) >= self._max_size:
             self._flush()
-        else:
-            self._timer = self._loop.call_later(0.1, self._flush)
+        elif self._timer is None:
+            # a single timer per batch is re-armed lazily instead of on every event
+            self._timer = self._loop.call_later(self._delay, self._on_timer)
@@ -26,12 +26,15 @@ import asyncio
 import datetime
 import functools
 import html
+import itertools
 import json
 import logging
 import re
+import sys
 from argparse import Namespace
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
 
+import aiohttp
 import zulip
 from bidict import bidict
 from mautrix.util.bridge_state import BridgeStateEvent
@@ -50,14 +53,28 @@ from matrixzulipbridge.stream_room import StreamRoom
 
 # pylint: disable=unused-import
 from matrixzulipbridge.under_organization_room import connected
-from matrixzulipbridge.zulip import ZulipEventHandler
+from matrixzulipbridge.zulip import ZulipEventHandler, ZulipEventListener
 
 if TYPE_CHECKING:
-    from mautrix.types import UserID
+    from mautrix.types import RoomID, UserID
 
     from matrixzulipbridge.appservice import AppService
     from matrixzulipbridge.types import ZulipUserID
 
+# shared empty arguments for internally chained commands
+_EMPTY_NS = Namespace()
+
+# arbitrary translations of Zulip roles to Matrix permissions
+_ROLE_POWER = {
+    100: 95,  # owner
+    200: 80,  # administrator
+    300: 50,  # moderator
+    400: 0,  # member
+    600: 0,  # guest
+}
+# roles we have already warned about
+_UNKNOWN_ROLES = set()
+
 
 class OrganizationRoom(Room):
     # configuration stuff
@@ -73,14 +90,19 @@ class OrganizationRoom(Room):
     zulip_puppet_login: dict["UserID", dict]
     zulip_puppets: dict["UserID", "zulip.Client"]
     zulip_puppet_user_mxid: bidict["ZulipUserID", "UserID"]
+    zulip_clients: dict[tuple[str, str, str], "zulip.Client"]
+    zulip_listener: Optional[ZulipEventListener]
+    http_session: Optional[aiohttp.ClientSession]
+    zulip_puppet_listeners: dict["UserID", ZulipEventListener]
 
     # state
     commands: CommandManager
     rooms: dict[str, Room]
+    rooms_by_name: dict[str, StreamRoom]
     direct_rooms: dict[frozenset["ZulipUserID"], "DirectRoom"]
     connecting: bool
     backoff: int
-    backoff_task: Any
+    disconnect_event: asyncio.Event
     connected_at: int
     space: SpaceRoom
     post_init_done: bool
@@ -88,7 +110,12 @@ class OrganizationRoom(Room):
 
     organization: "OrganizationRoom"
 
+    _command_specs: Optional[list[tuple[CommandParser, str]]] = None
+
     profile: dict
+    profile_fetched_at: float
+    profile_lock: asyncio.Lock
+    profile_json: dict[bool, str]
     server: dict
     messages: dict[str, str]
     permissions: dict[str, str]
@@ -96,13 +123,16 @@ class OrganizationRoom(Room):
     max_backfill_amount: int
     relay_moderation: bool
     deactivated_users: set["ZulipUserID"]
+    synced_permissions: dict["RoomID", int]
+    puppet_mxid_re: Optional[re.Pattern]
+    puppet_zulip_ids: dict["UserID", "ZulipUserID"]
 
     def init(self):
         self.name = None
         self.connected = False
         self.fullname = None
         self.backoff = 0
-        self.backoff_task = None
+        self.disconnect_event = asyncio.Event()
         self.connected_at = 0
 
         self.api_key = None
@@ -112,18 +142,28 @@ class OrganizationRoom(Room):
         self.zulip_puppet_login = {}
         self.zulip_puppets = {}
         self.zulip_puppet_user_mxid = bidict()
+        self.zulip_clients = {}
+        self.zulip_listener = None
+        self.zulip_puppet_listeners = {}
+        self.http_session = None
 
         self.commands = CommandManager()
         self.zulip = None
         self.rooms = {}
+        self.rooms_by_name = {}
         self.direct_rooms = {}
         self.connlock = asyncio.Lock()
+        self._loop = asyncio.get_running_loop()
         self.disconnect = True
         self.space = None
+        self.post_init_done = False
 
         self.organization = self
 
         self.profile = None
+        self.profile_fetched_at = 0
+        self.profile_lock = asyncio.Lock()
+        self.profile_json = {}
         self.server = None
         self.messages = {}
         self.permissions = {}
@@ -131,6 +171,28 @@ class OrganizationRoom(Room):
         self.max_backfill_amount = 100
         self.relay_moderation = True
         self.deactivated_users = set()
+        self.synced_permissions = {}
+        self.puppet_mxid_re = None
+        self.puppet_zulip_ids = {}
+        self.pending_read_ids = []
+        self.read_receipt_task = None
+
+        for cmd, method in self._get_command_specs():
+            self.commands.register(cmd, getattr(self, method))
+
+        self.mx_register("m.room.message", self.on_mx_message)
+
+    @classmethod
+    def _get_command_specs(cls) -> list[tuple[CommandParser, str]]:
+        """Build the command parsers once and share them between instances
+
+        Returns:
+            list[tuple[CommandParser, str]]: parser and handler method name pairs
+        """
+        if cls._command_specs is not None:
+            return cls._command_specs
+
+        specs = []
 
         cmd = CommandParser(
             prog="FULLNAME",
@@ -140,28 +202,28 @@ class OrganizationRoom(Room):
             ),
         )
         cmd.add_argument("fullname", nargs="?", help="new full name")
-        self.commands.register(cmd, self.cmd_fullname)
+        specs.append((cmd, "cmd_fullname"))
 
         cmd = CommandParser(
             prog="SITE",
             description="set Zulip site",
         )
         cmd.add_argument("site", nargs="?", help="new site")
-        self.commands.register(cmd, self.cmd_site)
+        specs.append((cmd, "cmd_site"))
 
         cmd = CommandParser(
             prog="EMAIL",
             description="set Zulip bot email",
         )
         cmd.add_argument("email", nargs="?", help="new bot email")
-        self.commands.register(cmd, self.cmd_email)
+        specs.append((cmd, "cmd_email"))
 
         cmd = CommandParser(
             prog="APIKEY",
             description="set Zulip bot api key",
         )
         cmd.add_argument("api_key", nargs="?", help="new API key")
-        self.commands.register(cmd, self.cmd_apikey)
+        specs.append((cmd, "cmd_apikey"))
 
         cmd = CommandParser(
             prog="CONNECT",
@@ -174,7 +236,7 @@ class OrganizationRoom(Room):
                 "If you want to cancel automatic reconnect you need to issue the DISCONNECT command.\n"
             ),
         )
-        self.commands.register(cmd, self.cmd_connect)
+        specs.append((cmd, "cmd_connect"))
 
         cmd = CommandParser(
             prog="DISCONNECT",
@@ -184,10 +246,10 @@ class OrganizationRoom(Room):
                 "reconnection attempt.\n"
             ),
         )
-        self.commands.register(cmd, self.cmd_disconnect)
+        specs.append((cmd, "cmd_disconnect"))
 
         cmd = CommandParser(prog="RECONNECT", description="reconnect to organization")
-        self.commands.register(cmd, self.cmd_reconnect)
+        specs.append((cmd, "cmd_reconnect"))
 
         cmd = CommandParser(
             prog="SUBSCRIBE",
@@ -205,27 +267,30 @@ class OrganizationRoom(Room):
             "backfill", nargs="?", help="number of messages to backfill", type=int
         )
         cmd.add_argument("room", nargs="?", help="room ID")
-        self.commands.register(cmd, self.cmd_subscribe)
+        specs.append((cmd, "cmd_subscribe"))
 
         cmd = CommandParser(
             prog="UNSUBSCRIBE",
             description="unbridge a stream and leave the room",
         )
         cmd.add_argument("stream", help="target stream")
-        self.commands.register(cmd, self.cmd_unsubscribe)
+        specs.append((cmd, "cmd_unsubscribe"))
 
         cmd = CommandParser(
             prog="SPACE", description="join/create a space for this organization"
         )
-        self.commands.register(cmd, self.cmd_space)
+        specs.append((cmd, "cmd_space"))
 
         cmd = CommandParser(
             prog="SYNCPERMISSIONS", description="resync all permissions"
         )
-        self.commands.register(cmd, self.cmd_syncpermissions)
+        specs.append((cmd, "cmd_syncpermissions"))
 
         cmd = CommandParser(prog="PROFILE", description="fetch our Zulip profile")
-        self.commands.register(cmd, self.cmd_profile)
+        cmd.add_argument(
+            "--pretty", action="store_true", help="indent the returned profile"
+        )
+        specs.append((cmd, "cmd_profile"))
 
         cmd = CommandParser(
             prog="ROOM",
@@ -239,12 +304,12 @@ class OrganizationRoom(Room):
         cmd.add_argument(
             "command", help="Command and arguments", nargs=argparse.REMAINDER
         )
-        self.commands.register(cmd, self.cmd_room)
+        specs.append((cmd, "cmd_room"))
 
         cmd = CommandParser(
             prog="STATUS", description="show current organization status"
         )
-        self.commands.register(cmd, self.cmd_status)
+        specs.append((cmd, "cmd_status"))
 
         cmd = CommandParser(
             prog="BACKFILL",
@@ -255,13 +320,13 @@ class OrganizationRoom(Room):
             "--update", action="store_true", help="also set this to all existing rooms"
         )
         cmd.add_argument("--now", action="store_true", help="start backfilling now")
-        self.commands.register(cmd, self.cmd_backfill)
+        specs.append((cmd, "cmd_backfill"))
 
         cmd = CommandParser(
             prog="PERSONALROOM",
             description="create a personal room",
         )
-        self.commands.register(cmd, self.cmd_personalroom)
+        specs.append((cmd, "cmd_personalroom"))
         cmd = CommandParser(
             prog="RELAYMODERATION",
             description="Whether to relay bans to Zulip",
@@ -278,9 +343,10 @@ class OrganizationRoom(Room):
             help="turn relaying moderation off",
             action="store_true",
         )
-        self.commands.register(cmd, self.cmd_relaymoderation)
+        specs.append((cmd, "cmd_relaymoderation"))
 
-        self.mx_register("m.room.message", self.on_mx_message)
+        cls._command_specs = specs
+        return specs
 
     @staticmethod
     async def create(serv: "AppService", organization: dict, user_id: "UserID", name):
@@ -306,7 +372,7 @@ class OrganizationRoom(Room):
 
     def from_config(self, config: dict):
         if "name" in config:
-            self.name = config["name"]
+            self.name = sys.intern(config["name"])
         else:
             raise InvalidConfigError("No name key in config for OrganizationRoom")
 
@@ -326,7 +392,11 @@ class OrganizationRoom(Room):
             self.max_backfill_amount = config["max_backfill_amount"]
 
         if "zulip_puppet_login" in config and config["zulip_puppet_login"]:
-            self.zulip_puppet_login = config["zulip_puppet_login"]
+            # mxids key several lookups, intern them once at load
+            self.zulip_puppet_login = {
+                sys.intern(user_id): login
+                for user_id, login in config["zulip_puppet_login"].items()
+            }
 
     def to_config(self) -> dict:
         return {
@@ -344,16 +414,15 @@ class OrganizationRoom(Room):
             return False
 
         # we require user to be in organization room or be connected with channels or PMs
-        if not self.in_room(self.user_id):
-            # if not connected (or trying to) we can clean up
-            if not self.connected:
-                return False
+        if self.in_room(self.user_id):
+            return True
 
-            # only if post_init has been done and we're connected with no rooms clean up
-            if self.post_init_done and self.connected and len(self.rooms) == 0:
-                return False
+        # if not connected (or trying to) we can clean up
+        if not self.connected:
+            return False
 
-        return True
+        # only if post_init has been done and we're connected with no rooms clean up
+        return not (self.post_init_done and not self.rooms)
 
     def cleanup(self) -> None:
         logging.debug(f"Network {self.id} cleaning up")
@@ -362,14 +431,21 @@ class OrganizationRoom(Room):
         self.connected = False
         self.disconnect = True
 
-        if self.backoff_task:
-            self.backoff_task.cancel()
-            self.backoff_task = None
-            logging.debug("... cancelled backoff task")
+        # wake up any pending reconnect backoff
+        self.disconnect_event.set()
 
         if self.zulip:
             self.zulip = None
 
+        self._stop_zulip_listener()
+        for listener in self.zulip_puppet_listeners.values():
+            listener.stop()
+        self.zulip_puppet_listeners.clear()
+
+        if self.http_session:
+            asyncio.ensure_future(self.http_session.close())
+            self.http_session = None
+
         if self.space:
             self.serv.unregister_room(self.space.id)
             self.space.cleanup()
@@ -391,7 +467,7 @@ class OrganizationRoom(Room):
             return self.send_notice(str(e))
 
     async def on_mx_message(self, event) -> None:
-        if str(event.content.msgtype) != "m.text" or event.sender == self.serv.user_id:
+        if event.sender == self.serv.user_id or str(event.content.msgtype) != "m.text":
             return
 
         # ignore edits
@@ -399,12 +475,9 @@ class OrganizationRoom(Room):
             return
 
         try:
-            lines = event.content.body.split("\n")
-
-            command = lines.pop(0)
-            tail = "\n".join(lines) if len(lines) > 0 else None
+            command, sep, tail = event.content.body.partition("\n")
 
-            await self.commands.trigger(command, tail)
+            await self.commands.trigger(command, tail if sep else None)
         except CommandParserError as e:
             self.send_notice(str(e))
 
@@ -415,9 +488,7 @@ class OrganizationRoom(Room):
     async def cmd_disconnect(self, _args) -> None:
         self.disconnect = True
 
-        if self.backoff_task:
-            self.backoff_task.cancel()
-            self.backoff_task = None
+        self.disconnect_event.set()
 
         self.backoff = 0
         self.connected_at = 0
@@ -427,25 +498,25 @@ class OrganizationRoom(Room):
             await self.save()
 
         if self.zulip:
+            # the client stays cached for reconnects, only stop its listener
+            self._stop_zulip_listener()
             self.zulip = None
             self.send_notice("Disconnected")
 
     async def cmd_reconnect(self, _args) -> None:
-        await self.cmd_disconnect(Namespace())
-        await self.cmd_connect(Namespace())
+        await self.cmd_disconnect(_EMPTY_NS)
+        await self.cmd_connect(_EMPTY_NS)
 
     @connected
     async def cmd_subscribe(self, args) -> None:
         stream = args.stream
 
-        for room in self.rooms.values():
-            if not isinstance(room, StreamRoom):
-                continue
-            if stream.lower() == room.name:
-                self.send_notice(f"Stream {stream} already exists at {room.id}.")
-                return
+        room = self.rooms_by_name.get(stream.lower())
+        if room is not None:
+            self.send_notice(f"Stream {stream} already exists at {room.id}.")
+            return
 
-        self.zulip.add_subscriptions([{"name": stream}])
+        await self.zulip_call(self.zulip.add_subscriptions, [{"name": stream}])
         room = await StreamRoom.create(
             organization=self,
             name=stream,
@@ -458,14 +529,7 @@ class OrganizationRoom(Room):
     async def cmd_unsubscribe(self, args) -> None:
         stream = args.stream.lower()
 
-        room = None
-        for r in self.rooms.values():
-            if not isinstance(r, StreamRoom):
-                continue
-            if r.name.lower() == stream:
-                room = r
-                break
-
+        room = self.rooms_by_name.get(stream)
         if room is None:
             self.send_notice("No room with that name exists.")
             return
@@ -474,8 +538,9 @@ class OrganizationRoom(Room):
         room.cleanup()
         await self.serv.leave_room(room.id, room.members)
         del self.rooms[room.stream_id]
+        del self.rooms_by_name[stream]
 
-        self.zulip.remove_subscriptions([stream])
+        await self.zulip_call(self.zulip.remove_subscriptions, [stream])
         self.send_notice(f"Unsubscribed from {stream} and removed room {room.id}.")
 
     def get_fullname(self):
@@ -491,10 +556,13 @@ class OrganizationRoom(Room):
             return
 
         if self.zulip and self.zulip.has_connected:
-            self.zulip.update_user_by_id(
-                self.profile["user_id"], full_name=args.fullname
+            await self.zulip_call(
+                self.zulip.update_user_by_id,
+                self.profile["user_id"],
+                full_name=args.fullname,
             )
             self.fullname = args.fullname
+            self.profile_fetched_at = 0
             self.send_notice(f"Full name set to {self.fullname}")
 
     async def cmd_site(self, args) -> None:
@@ -524,21 +592,17 @@ class OrganizationRoom(Room):
         await self.save()
         self.send_notice("Bot API Key changed")
 
-    async def cmd_profile(self, _args) -> None:
-        self.profile = self.zulip.get_profile()
-        self.send_notice(json.dumps(self.profile, indent=4))
+    async def cmd_profile(self, args) -> None:
+        profile = await self.get_profile()
+        if args.pretty not in self.profile_json:
+            if args.pretty:
+                self.profile_json[True] = json.dumps(profile, indent=4)
+            else:
+                self.profile_json[False] = json.dumps(profile, separators=(",", ":"))
+        self.send_notice(self.profile_json[args.pretty])
 
     async def cmd_room(self, args) -> None:
-        target = args.target.lower()
-
-        room = None
-
-        for r in self.rooms.values():
-            if not isinstance(r, StreamRoom):
-                continue
-            if r.name.lower() == target:
-                room = r
-
+        room = self.rooms_by_name.get(args.target.lower())
         if not room:
             self.send_notice(f"No room for {args.target}")
             return
@@ -549,28 +613,27 @@ class OrganizationRoom(Room):
         await room.commands.trigger_args(args.command, forward=True)
 
     async def cmd_status(self, _args) -> None:
+        # collect everything into one notice to send a single Matrix event
+        lines = []
+
         if self.connected_at > 0:
-            conntime = asyncio.get_running_loop().time() - self.connected_at
+            conntime = self._loop.time() - self.connected_at
             conntime = str(datetime.timedelta(seconds=int(conntime)))
-            self.send_notice(f"Connected for {conntime}")
+            lines.append(f"Connected for {conntime}")
 
         else:
-            self.send_notice("Not connected to server.")
+            lines.append("Not connected to server.")
 
-        dms = []
-        streams = []
+        streams = [room.name for room in self.rooms_by_name.values()]
+        dm_count = len(self.direct_rooms)
 
-        for room in self.rooms.values():
-            if isinstance(room, StreamRoom):
-                streams.append(room.name)
-        for dm_room in self.direct_rooms.values():
-            dms.append(dm_room.name)
+        if streams:
+            lines.append(f"Streams: #{', #'.join(streams)}")
 
-        if len(streams) > 0:
-            self.send_notice(f"Streams: #{', #'.join(streams)}")
+        if dm_count:
+            lines.append(f"Open DMs: {dm_count}")
 
-        if len(dms) > 0:
-            self.send_notice(f"Open DMs: {len(dms)}")
+        self.send_notice("\n".join(lines))
 
     async def cmd_space(self, _args) -> None:
         if self.space is None:
@@ -586,7 +649,7 @@ class OrganizationRoom(Room):
             self.send_notice(f"Space already exists ({self.space.id}).")
 
     async def cmd_syncpermissions(self, _args) -> None:
-        await self._sync_permissions()
+        await self._sync_permissions(force=True)
         self.send_notice("Permissions synched successfully")
 
     async def cmd_backfill(self, args) -> None:
@@ -632,6 +695,8 @@ class OrganizationRoom(Room):
             )
             return
 
+        # acts as a try-lock: nothing can take the lock before we enter below and
+        # asyncio.Lock acquires an uncontended lock without suspending
         if self.connlock.locked():
             self.send_notice("Already connecting.")
             return
@@ -645,19 +710,20 @@ class OrganizationRoom(Room):
             await self._connect()
 
     async def post_init(self) -> None:
-        # attach loose sub-rooms to us
-        for room_type in [DirectRoom, StreamRoom, PersonalRoom]:
+        # attach loose sub-rooms to us, room type -> (target dict, key)
+        attach_targets = {
+            DirectRoom: (self.direct_rooms, lambda r: r.recipient_key),
+            StreamRoom: (self.rooms, lambda r: r.stream_id),
+            PersonalRoom: (self.rooms, lambda r: r.id),
+        }
+        for room_type, (target, key) in attach_targets.items():
             for room in self.serv.find_rooms(room_type, organization_id=self.id):
                 room.organization = self
 
                 logging.debug(f"{self.id} attaching {room.id}")
-                match room:
-                    case StreamRoom():
-                        self.rooms[room.stream_id] = room
-                    case DirectRoom():
-                        self.direct_rooms[frozenset(room.recipient_ids)] = room
-                    case _:
-                        self.rooms[room.id] = room
+                target[key(room)] = room
+                if room_type is StreamRoom:
+                    self.rooms_by_name[room.name.lower()] = room
         logging.debug(self.direct_rooms)
 
         self.post_init_done = True
@@ -676,8 +742,13 @@ class OrganizationRoom(Room):
         if self.zulip:
             self.zulip = None
 
+        self.disconnect_event.clear()
+
+        # organizations are only ever removed in-place from this dict
+        organizations = self.serv.config["organizations"]
+
         while not self.disconnect:
-            if self.name not in self.serv.config["organizations"]:
+            if self.name not in organizations:
                 self.send_notice(
                     "This organization does not exist on this bridge anymore."
                 )
@@ -690,9 +761,13 @@ class OrganizationRoom(Room):
                     )
                 )
 
-                self.zulip = zulip.Client(
-                    self.email, api_key=self.api_key, site=self.site
-                )
+                client_key = (self.email, self.api_key, self.site)
+                self.zulip = self.zulip_clients.get(client_key)
+                if self.zulip is None:
+                    self.zulip = zulip.Client(
+                        self.email, api_key=self.api_key, site=self.site
+                    )
+                    self.zulip_clients[client_key] = self.zulip
 
                 if not self.connected:
                     self.connected = True
@@ -704,24 +779,23 @@ class OrganizationRoom(Room):
                     return
 
                 self.disconnect = False
-                self.connected_at = asyncio.get_running_loop().time()
+                self.backoff = 0
+                self.connected_at = self._loop.time()
 
-                self.profile = self.zulip.get_profile()
-                self.server = self.zulip.get_server_settings()
+                await self.get_profile(refresh=True)
+                self.server = await self.zulip_call(self.zulip.get_server_settings)
 
                 self.zulip_handler = ZulipEventHandler(self)
 
                 # Start Zulip event listerner
-                asyncio.get_running_loop().run_in_executor(
-                    None,
-                    functools.partial(
-                        self.zulip.call_on_each_event,
-                        lambda event: self.zulip_handler.on_event(  # pylint: disable=unnecessary-lambda
-                            event
-                        ),
-                        apply_markdown=True,
-                    ),
+                self._stop_zulip_listener()
+                self.zulip_listener = ZulipEventListener(
+                    self.get_http_session(),
+                    self.zulip,
+                    self.zulip_handler.on_event,
+                    apply_markdown=True,
                 )
+                self.zulip_listener.start()
 
                 asyncio.ensure_future(self._on_connect())
 
@@ -737,23 +811,102 @@ class OrganizationRoom(Room):
             except Exception as e:
                 self.send_notice(f"Failed to connect: {str(e)}")
 
-            if self.backoff < 1800:
-                self.backoff = self.backoff * 2
-            if self.backoff < 5:
-                self.backoff = 5
+            # 5 seconds doubling up to 30 minutes
+            self.backoff = min(1800, max(5, self.backoff * 2))
 
             self.send_notice(f"Retrying in {self.backoff} seconds...")
 
-            self.backoff_task = asyncio.ensure_future(asyncio.sleep(self.backoff))
             try:
-                await self.backoff_task
-            except asyncio.CancelledError:
+                await asyncio.wait_for(
+                    self.disconnect_event.wait(), timeout=self.backoff
+                )
                 break
-            finally:
-                self.backoff_task = None
+            except asyncio.TimeoutError:
+                pass
 
         self.send_notice("Connection aborted.")
 
+    def get_http_session(self) -> aiohttp.ClientSession:
+        """Get the keep-alive HTTP session shared by all event listeners
+
+        Returns:
+            aiohttp.ClientSession: session, created on first use
+        """
+        if self.http_session is None or self.http_session.closed:
+            # every listener holds a long-poll open, so don't cap connections
+            self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0, keepalive_timeout=75)
+            )
+        return self.http_session
+
+    def _stop_zulip_listener(self) -> None:
+        if self.zulip_listener:
+            self.zulip_listener.stop()
+            self.zulip_listener = None
+
+    async def zulip_call(self, func: Callable, *args, **kwargs):
+        """Run a blocking zulip.Client call in the executor
+
+        Args:
+            func (Callable): client method to call
+            *args, **kwargs: passed to func
+
+        Returns:
+            whatever func returns
+        """
+        return await self._loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs)
+        )
+
+    def mark_read(self, zulip_message_id: int) -> None:
+        """Queue a Zulip message to be marked as read
+
+        Messages queued within half a second are flagged in a single request.
+
+        Args:
+            zulip_message_id (int): Zulip message ID
+        """
+        self.pending_read_ids.append(zulip_message_id)
+
+        if self.read_receipt_task is None:
+            self.read_receipt_task = asyncio.create_task(self._send_read_receipts())
+
+    async def _send_read_receipts(self) -> None:
+        await asyncio.sleep(0.5)
+
+        message_ids = self.pending_read_ids
+        self.pending_read_ids = []
+        self.read_receipt_task = None
+
+        if self.zulip is None:
+            return
+
+        try:
+            await self.zulip_call(
+                self.zulip.update_message_flags,
+                {"messages": message_ids, "op": "add", "flag": "read"},
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception(f"Marking {len(message_ids)} messages as read failed")
+
+    async def get_profile(self, refresh: bool = False) -> dict:
+        """Get the bot's Zulip profile, fetching it at most once a minute
+
+        Concurrent callers share a single request.
+
+        Args:
+            refresh (bool, optional): ignore the cached profile. Defaults to False.
+
+        Returns:
+            dict: Zulip profile
+        """
+        async with self.profile_lock:
+            if refresh or self._loop.time() - self.profile_fetched_at >= 60:
+                self.profile = await self.zulip_call(self.zulip.get_profile)
+                self.profile_fetched_at = self._loop.time()
+                self.profile_json = {}
+            return self.profile
+
     async def _on_connect(self):
         await self._get_users()
         await self._login_zulip_puppets()
@@ -762,7 +915,7 @@ class OrganizationRoom(Room):
         await self.backfill_messages()
 
     async def _get_users(self):
-        result = self.zulip.get_members()
+        result = await self.zulip_call(self.zulip.get_members)
         if result["result"] != "success":
             raise Exception(f"Could not get Zulip users: {result['msg']}")
         for user in result["members"]:
@@ -771,8 +924,17 @@ class OrganizationRoom(Room):
                 self.deactivated_users.add(str(user["user_id"]))
 
     async def _login_zulip_puppets(self):
-        for user_id, login in self.zulip_puppet_login.items():
-            await self.login_zulip_puppet(user_id, login["email"], login["api_key"])
+        logins = list(self.zulip_puppet_login.items())
+        results = await asyncio.gather(
+            *(
+                self.login_zulip_puppet(user_id, login["email"], login["api_key"])
+                for user_id, login in logins
+            ),
+            return_exceptions=True,
+        )
+        for (user_id, _), result in zip(logins, results):
+            if isinstance(result, Exception):
+                logging.error(f"Failed to login Zulip puppet {user_id}: {result}")
 
     async def login_zulip_puppet(self, user_id: "UserID", email: str, api_key: str):
         """Create a Zulip puppet
@@ -782,94 +944,123 @@ class OrganizationRoom(Room):
             email (str): Zulip account email
             api_key (str): Zulip account API key
         """
-        client = zulip.Client(email, api_key=api_key, site=self.site)
+        client = await self.zulip_call(
+            zulip.Client, email, api_key=api_key, site=self.site
+        )
         self.zulip_puppets[user_id] = client
-        profile = client.get_profile()
+        profile = await self.zulip_call(client.get_profile)
         if "user_id" not in profile:
             return
-        self.zulip_puppet_user_mxid[str(profile["user_id"])] = user_id
+        self.zulip_puppet_user_mxid[sys.intern(str(profile["user_id"]))] = user_id
 
         # Create event queue for receiving DMs
-        asyncio.get_running_loop().run_in_executor(
-            None,
-            functools.partial(
-                client.call_on_each_event,
-                lambda event: self.on_puppet_event(  # pylint: disable=unnecessary-lambda
-                    event
-                ),
-                apply_markdown=True,
-                event_types=["message"],  # required for narrow
-                narrow=[["is", "dm"]],
-            ),
+        if user_id in self.zulip_puppet_listeners:
+            self.zulip_puppet_listeners[user_id].stop()
+        listener = ZulipEventListener(
+            self.get_http_session(),
+            client,
+            self.on_puppet_event,
+            apply_markdown=True,
+            event_types=["message"],  # required for narrow
+            narrow=[["is", "dm"]],
         )
-        await self.save()
+        self.zulip_puppet_listeners[user_id] = listener
+        listener.start()
         return profile
 
     def delete_zulip_puppet(self, user_id: "UserID"):
-        if user_id in self.zulip_puppets:
-            del self.zulip_puppets[user_id]
-        if user_id in self.zulip_puppet_user_mxid.inv:
-            del self.zulip_puppet_user_mxid.inv[user_id]
-        if user_id in self.zulip_puppet_login:
-            del self.zulip_puppet_login[user_id]
-
-    async def _sync_permissions(self):
+        if user_id in self.zulip_puppet_listeners:
+            self.zulip_puppet_listeners.pop(user_id).stop()
+        self.zulip_puppets.pop(user_id, None)
+        self.zulip_puppet_user_mxid.inv.pop(user_id, None)
+        self.zulip_puppet_login.pop(user_id, None)
+
+    async def _sync_permissions(self, force: bool = False):
         # Owner should have the highest permissions (after bot)
         self.permissions[self.serv.config["owner"]] = 99
 
-        # arbitrary translations of Zulip roles to Matrix permissions
-        role_permission_mapping = {
-            100: 95,  # owner
-            200: 80,  # administrator
-            300: 50,  # moderator
-            400: 0,  # member
-            600: 0,  # guest
-        }
-
         for zulip_user_id, user in self.zulip_users.items():
-            user_id = self.serv.get_mxid_from_zulip_user_id(self, zulip_user_id)
-            power_level = role_permission_mapping[user["role"]]
-            self.permissions[user_id] = power_level
-
-        rooms = set(self.rooms.values())
-        rooms.add(self)
-        rooms.add(self.space)
-        logging.info(len(rooms))
-
-        for room in rooms:
-            if not isinstance(room, (StreamRoom, OrganizationRoom, SpaceRoom)):
-                continue
-            logging.debug(f"Synching permissions in {self.name} - {room.id}")
-            await room.sync_permissions(self.permissions)
+            user_id = sys.intern(
+                self.serv.get_mxid_from_zulip_user_id(self, zulip_user_id)
+            )
+            role = user["role"]
+            if role not in _ROLE_POWER and role not in _UNKNOWN_ROLES:
+                _UNKNOWN_ROLES.add(role)
+                logging.warning(f"Unknown Zulip role {role}, using power level 0")
+            self.permissions[user_id] = _ROLE_POWER.get(role, 0)
+
+        # iterate the live dict view rather than copying it into a set
+        rooms = itertools.chain(self.rooms.values(), (self, self.space))
+
+        # skip rooms that already got this exact set of permissions
+        perm_hash = hash(frozenset(self.permissions.items()))
+        semaphore = asyncio.Semaphore(16)
+
+        async def sync(room: Room):
+            async with semaphore:
+                logging.debug(f"Synching permissions in {self.name} - {room.id}")
+                await room.sync_permissions(self.permissions)
+            self.synced_permissions[room.id] = perm_hash
+
+        results = await asyncio.gather(
+            *(
+                sync(room)
+                for room in rooms
+                if isinstance(room, (StreamRoom, OrganizationRoom, SpaceRoom))
+                and (force or self.synced_permissions.get(room.id) != perm_hash)
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error("Synching permissions failed", exc_info=result)
 
     async def _sync_all_room_members(self):
-        result = self.zulip.get_subscriptions(request={"include_subscribers": True})
+        result = await self.zulip_call(
+            self.zulip.get_subscriptions, request={"include_subscribers": True}
+        )
         if result["result"] != "success":
             logging.error(
                 f"Getting subscriptions for {self.name} failed! Message: {result['msg']}"
             )
             return
-        streams = result["subscriptions"]
-        for stream in streams:
+        semaphore = asyncio.Semaphore(32)
+
+        async def sync(room: StreamRoom, subscribers: list["ZulipUserID"]):
+            async with semaphore:
+                await room.sync_zulip_members(subscribers)
+
+        tasks = []
+        for stream in result["subscriptions"]:
             room = self.rooms.get(stream["stream_id"])
             if not room or not isinstance(room, StreamRoom):
                 continue
-            asyncio.ensure_future(room.sync_zulip_members(stream["subscribers"]))
+            tasks.append(sync(room, stream["subscribers"]))
 
-    def get_zulip_user(self, user_id: "ZulipUserID", update_cache: bool = False):
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error("Synching stream members failed", exc_info=result)
+
+    async def get_zulip_user(self, user_id: "ZulipUserID", update_cache: bool = False):
         if update_cache or user_id not in self.zulip_users:
-            result = self.zulip.get_user_by_id(user_id)
+            result = await self.zulip_call(self.zulip.get_user_by_id, user_id)
             if result["result"] != "success":
                 return None
             self.zulip_users[user_id] = result["user"]
         return self.zulip_users[user_id]
 
     def get_zulip_user_id_from_mxid(self, mxid: "UserID") -> Optional["ZulipUserID"]:
+        if mxid in self.puppet_zulip_ids:
+            return self.puppet_zulip_ids[mxid]
         if self.serv.is_puppet(mxid):
-            ret = re.search(
-                rf"@{self.serv.puppet_prefix}{self.name.lower()}{self.serv.puppet_separator}(\d+):{self.serv.server_name}",
-                mxid,
-            )
+            if self.puppet_mxid_re is None:
+                self.puppet_mxid_re = re.compile(
+                    rf"@{self.serv.puppet_prefix}{self.name.lower()}{self.serv.puppet_separator}(\d+):{self.serv.server_name}"
+                )
+            ret = self.puppet_mxid_re.search(mxid)
+            # puppet mxids never change their Zulip id
+            self.puppet_zulip_ids[mxid] = ret.group(1)
             return ret.group(1)
         elif mxid in self.zulip_puppet_user_mxid.inv:
             return self.zulip_puppet_user_mxid.inv[mxid]
@@ -877,18 +1068,28 @@ class OrganizationRoom(Room):
             return None
 
     async def backfill_messages(self):
-        for room in self.rooms.values():
-            if not isinstance(room, StreamRoom):
-                continue
-            if room.max_backfill_amount == 0:
-                continue
-
-            await room.backfill_messages()
-
-        for room in self.direct_rooms.values():
-            await room.backfill_messages()
+        # rooms are independent, backfill a few of them at a time
+        semaphore = asyncio.Semaphore(8)
+
+        async def backfill(room: DirectRoom):
+            async with semaphore:
+                await room.backfill_messages()
+
+        rooms = [
+            room
+            for room in self.rooms.values()
+            if isinstance(room, StreamRoom) and room.max_backfill_amount != 0
+        ]
+        rooms.extend(self.direct_rooms.values())
+
+        results = await asyncio.gather(
+            *(backfill(room) for room in rooms), return_exceptions=True
+        )
+        for room, result in zip(rooms, results):
+            if isinstance(result, Exception):
+                logging.error(f"Backfilling {room.id} failed", exc_info=result)
 
-    def on_puppet_event(self, event: dict) -> None:
+    async def on_puppet_event(self, event: dict) -> None:
         if event["type"] != "message":
             return
         self.dm_message(event["message"])
@@ -897,8 +1098,20 @@ class OrganizationRoom(Room):
         event = {"type": "_dm_message", "message": message}
         self._queue.enqueue(event)
 
-    async def _flush_event(self, event: dict):
-        if event["type"] == "_dm_message":
-            await self.zulip_handler.handle_dm_message(event["message"])
-        else:
-            return await super()._flush_event(event)
+    async def _flush_events(self, events: Iterable[dict]):
+        # DMs are handed over as one batch, everything else is flushed as usual
+        dm_messages = []
+        other_events = []
+        for event in events:
+            if event["type"] == "_dm_message":
+                dm_messages.append(event["message"])
+            else:
+                other_events.append(event)
+
+        if dm_messages:
+            try:
+                await self.zulip_handler.handle_dm_message_batch(dm_messages)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception("Queued DM messages failed")
+
+        await super()._flush_events(other_events)
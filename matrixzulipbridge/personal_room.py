@@ -23,6 +23,7 @@
 #
 import asyncio
 import logging
+import sys
 from typing import TYPE_CHECKING
 
 from matrixzulipbridge import __version__
@@ -85,6 +86,7 @@ class PersonalRoom(UnderOrganizationRoom):
         logging.debug(
             f"PersonalRoom.create(organization='{organization.name}', user_mxid='{user_mxid}'"
         )
+        user_mxid = sys.intern(user_mxid)
         room = PersonalRoom(
             None,
             user_mxid,
@@ -100,24 +102,27 @@ class PersonalRoom(UnderOrganizationRoom):
         organization.serv.register_room(room)
         organization.rooms[user_mxid] = room
 
-        asyncio.ensure_future(room.create_mx(user_mxid))
+        asyncio.get_running_loop().create_task(room.create_mx(user_mxid))
         return room
 
     def from_config(self, config: dict) -> None:
         super().from_config(config)
 
         if "owner_mxid" in config:
-            self.owner_mxid = config["owner_mxid"]
+            self.owner_mxid = sys.intern(config["owner_mxid"])
 
         if "owner_zulip_id" in config:
             self.owner_zulip_id = config["owner_zulip_id"]
 
     def to_config(self) -> dict:
-        return {
-            **(super().to_config()),
-            "owner_mxid": self.owner_mxid,
-            "owner_zulip_id": self.owner_zulip_id,
-        }
+        config = super().to_config()
+        config.update(
+            {
+                "owner_mxid": self.owner_mxid,
+                "owner_zulip_id": self.owner_zulip_id,
+            }
+        )
+        return config
 
     async def create_mx(self, user_mxid: "UserID") -> None:
         if self.id is None:
@@ -139,10 +144,10 @@ class PersonalRoom(UnderOrganizationRoom):
         if self.user_id is None:
             return False
 
-        if len(self.members) != 2:
+        if self.owner_mxid is None:
             return False
 
-        if self.owner_mxid is None:
+        if len(self.members) != 2:
             return False
 
         return True
@@ -169,37 +174,37 @@ class PersonalRoom(UnderOrganizationRoom):
             self.user_id, args.email, args.api_key
         )
         self.owner_zulip_id = profile["user_id"]
+        # only the login credentials need persisting on the organization
+        await self.organization.save()
         await self.save()
         self.send_notice_html("Enabled Zulip puppeting and logged in")
 
     async def cmd_logoutzulip(self, _args):
-        try:
-            del self.organization.zulip_puppet_login[self.user_id]
-        except KeyError:
+        if self.user_id not in self.organization.zulip_puppet_login:
             self.send_notice("You haven't enabled Zulip puppeting")
             return
-        try:
-            del self.organization.zulip_puppets[self.user_id]
-        except KeyError:
-            pass
+        self.organization.delete_zulip_puppet(self.user_id)
+        await self.organization.save()
         self.send_notice("Logged out of Zulip")
 
     async def cmd_dm(self, args):
         users: list[str] = args.user
         users.append(self.owner_mxid)
 
+        organization = self.organization
+        puppet_zulip_ids = organization.zulip_puppet_user_mxid.inverse
+
         recipients = []
+        recipient_ids = []
         for user in users:
-            user_zulip_id = None
-            if user in self.organization.zulip_puppet_user_mxid.inverse:
-                user_zulip_id = self.organization.zulip_puppet_user_mxid.inverse[user]
-            elif self.serv.is_puppet(user):
-                user_zulip_id = self.organization.get_zulip_user_id_from_mxid(user)
-            else:
-                self.send_notice(f"Can't create DM with {user}")
-                return
-
-            zulip_user = self.organization.get_zulip_user(user_zulip_id)
+            user_zulip_id = puppet_zulip_ids.get(user)
+            if user_zulip_id is None:
+                if not self.serv.is_puppet(user):
+                    self.send_notice(f"Can't create DM with {user}")
+                    return
+                user_zulip_id = organization.get_zulip_user_id_from_mxid(user)
+
+            zulip_user = await organization.get_zulip_user(user_zulip_id)
             if zulip_user is None or "user_id" not in zulip_user:
                 self.send_notice(f"Can't find Zulip user with ID {user_zulip_id}")
                 return
@@ -209,8 +214,8 @@ class PersonalRoom(UnderOrganizationRoom):
                     "full_name": zulip_user["full_name"],
                 }
             )
-        recipient_ids = frozenset(user["id"] for user in recipients)
-        room = self.organization.direct_rooms.get(recipient_ids)
+            recipient_ids.append(zulip_user["user_id"])
+        room = organization.direct_rooms.get(frozenset(recipient_ids))
         if room is not None:
             self.send_notice(f"You already have a room with these users at {room.id}")
             await room.check_if_nobody_left()
@@ -227,12 +232,9 @@ class PersonalRoom(UnderOrganizationRoom):
             return
 
         try:
-            lines = event.content.body.split("\n")
-
-            command = lines.pop(0)
-            tail = "\n".join(lines) if len(lines) > 0 else None
+            command, sep, tail = event.content.body.partition("\n")
 
-            await self.commands.trigger(command, tail)
+            await self.commands.trigger(command, tail if sep else None)
         except CommandParserError as e:
             self.send_notice(str(e))
 
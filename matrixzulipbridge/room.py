@@ -21,14 +21,16 @@
 # [This file includes modifications made by Emma Meijere]
 #
 #
+import asyncio
+import functools
 import logging
 import re
 from abc import ABC
-from collections import defaultdict
-from typing import TYPE_CHECKING, Callable, Iterable, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, ClassVar, Iterable, Optional
 
 from bidict import bidict
 from mautrix.appservice import AppService as MauService
+from mautrix.errors import MatrixConnectionError, MatrixRequestError
 from mautrix.errors.base import IntentError
 from mautrix.types import Membership
 from mautrix.types.event.type import EventType
@@ -36,6 +38,7 @@ from mautrix.types.event.type import EventType
 from matrixzulipbridge.event_queue import EventQueue
 
 if TYPE_CHECKING:
+    from mautrix.appservice import IntentAPI
     from mautrix.types import Event, EventID, RoomID, StateEvent, UserID
 
     from matrixzulipbridge.__main__ import BridgeAppService
@@ -43,6 +46,20 @@ if TYPE_CHECKING:
     from matrixzulipbridge.types import ThreadEventID, ZulipTopicName, ZulipUserID
 
 
+# Queued events that don't depend on each other's results and can be sent concurrently
+CONCURRENT_EVENT_TYPES = frozenset(("_redact", "m.reaction"))
+
+
+# Same matches as "<[^<]+?>" but without the lazy quantifier stepping per character
+_STRIP_TAGS_RE = re.compile("<[^<][^<>]*>")
+_LEAVE_OR_BAN = (Membership.LEAVE, Membership.BAN)
+
+
+@functools.lru_cache(maxsize=128)
+def _find_event_type(event_type: str) -> EventType:
+    return EventType.find(event_type)
+
+
 class RoomInvalidError(Exception):
     pass
 
@@ -52,19 +69,43 @@ class InvalidConfigError(Exception):
 
 
 class Room(ABC):
-    az: MauService
+    # Subclasses without their own __slots__ keep a __dict__ for their attributes
+    __slots__ = (
+        "id",
+        "user_id",
+        "serv",
+        "members",
+        "lazy_members",
+        "bans",
+        "displaynames",
+        "last_messages",
+        "thread_last_message",
+        "threads",
+        "send_read_receipt",
+        "_mx_handlers",
+        "_intents",
+        "_save_task",
+        "_power_levels_users",
+        "_queue",
+    )
+
+    az: ClassVar[MauService]
     id: "RoomID"
     user_id: "UserID"
     serv: "BridgeAppService"
-    members: list["UserID"]
+    members: set["UserID"]
     lazy_members: Optional[dict["UserID", str]]
-    bans: list["UserID"]
+    bans: set["UserID"]
     displaynames: dict["UserID", str]
+    last_messages: dict["UserID", "Event"]
     thread_last_message: dict["EventID", "EventID"]
     threads: bidict["ZulipTopicName", "ThreadEventID"]
     send_read_receipt: bool
 
     _mx_handlers: dict[str, list[Callable[[dict], bool]]]
+    _intents: dict["UserID", "IntentAPI"]
+    _save_task: Optional[asyncio.Task]
+    _power_levels_users: Optional[dict["UserID", int]]
     _queue: EventQueue
 
     def __init__(
@@ -78,16 +119,19 @@ class Room(ABC):
         self.id = id
         self.user_id = user_id
         self.serv = serv
-        self.members = list(members)
-        self.bans = list(bans) if bans else []
+        self.members = set(members)
+        self.bans = set(bans) if bans else set()
         self.lazy_members = None
         self.displaynames = {}
-        self.last_messages = defaultdict(str)
+        self.last_messages = {}
         self.thread_last_message = {}
         self.threads = bidict()
         self.send_read_receipt = True
 
         self._mx_handlers = {}
+        self._intents = {}
+        self._save_task = None
+        self._power_levels_users = None
         self._queue = EventQueue(self._flush_events)
 
         # start event queue
@@ -96,6 +140,7 @@ class Room(ABC):
 
         # we track room members
         self.mx_register("m.room.member", self._on_mx_room_member)
+        self.mx_register("m.room.power_levels", self._on_mx_room_power_levels)
 
         self.init()
 
@@ -122,6 +167,15 @@ class Room(ABC):
     def cleanup(self):
         self._queue.stop()
 
+        if self._save_task is not None:
+            pending = not self._save_task.done()
+            self._save_task.cancel()
+            self._save_task = None
+
+            # write out a pending debounced save now unless the room is going away
+            if pending and self.is_valid():
+                asyncio.ensure_future(self._delayed_save(0))
+
     def to_config(self) -> dict:
         return {
             "threads": dict(self.threads),
@@ -134,14 +188,33 @@ class Room(ABC):
         config["user_id"] = self.user_id
         await self.az.intent.set_account_data("zulip", config, self.id)
 
-    def mx_register(self, type: str, func: Callable[[dict], bool]) -> None:
-        if type not in self._mx_handlers:
-            self._mx_handlers[type] = []
+    def save_later(self, delay: float = 0.5) -> None:
+        """Schedule a save, coalescing repeated calls within the delay
 
-        self._mx_handlers[type].append(func)
+        Args:
+            delay (float, optional): Seconds to wait before saving. Defaults to 0.5.
+        """
+        if self._save_task is None:
+            self._save_task = asyncio.create_task(self._delayed_save(delay))
+
+    async def _delayed_save(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._save_task = None
+
+        try:
+            await self.save()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception(f"Saving room {self.id} failed")
+
+    def mx_register(self, type: str | EventType, func: Callable[[dict], bool]) -> None:
+        # Handlers are keyed by the bare type string, which is what EventType.t holds
+        if isinstance(type, EventType):
+            type = type.t
+
+        self._mx_handlers.setdefault(type, []).append(func)
 
     async def on_mx_event(self, event: "Event") -> None:
-        handlers = self._mx_handlers.get(str(event.type), [self._on_mx_unhandled_event])
+        handlers = self._mx_handlers.get(event.type.t, [self._on_mx_unhandled_event])
 
         for handler in handlers:
             await handler(event)
@@ -162,216 +235,368 @@ class Room(ABC):
         pass
 
     async def _on_mx_room_member(self, event: "StateEvent") -> None:
-        if (
-            event.content.membership in [Membership.LEAVE, Membership.BAN]
-            and event.state_key in self.members
-        ):
-            self.members.remove(event.state_key)
-            if event.state_key in self.displaynames:
-                del self.displaynames[event.state_key]
-            if event.state_key in self.last_messages:
-                del self.last_messages[event.state_key]
+        user_id = event.state_key
+        membership = event.content.membership
+
+        if membership in _LEAVE_OR_BAN and user_id in self.members:
+            self.members.remove(user_id)
+            self.displaynames.pop(user_id, None)
+            self.last_messages.pop(user_id, None)
 
             if not self.is_valid():
                 raise RoomInvalidError(
                     f"Room {self.id} ended up invalid after membership change, returning false from event handler."
                 )
 
-        if event.content.membership == Membership.LEAVE:
+        if membership == Membership.LEAVE:
             if event.prev_content.membership == Membership.BAN:
-                try:
-                    self.bans.remove(event.state_key)
-                except ValueError:
-                    pass
-                await self.on_mx_unban(event.state_key)
+                self.bans.discard(user_id)
+                await self.on_mx_unban(user_id)
             else:
-                await self.on_mx_leave(event.state_key)
+                await self.on_mx_leave(user_id)
 
-        if event.content.membership == Membership.BAN:
-            if event.state_key not in self.bans:
-                self.bans.append(event.state_key)
+        elif membership == Membership.BAN:
+            self.bans.add(user_id)
 
-            await self.on_mx_ban(event.state_key)
+            await self.on_mx_ban(user_id)
 
-        if event.content.membership == Membership.JOIN:
-            if event.state_key not in self.members:
-                self.members.append(event.state_key)
+        elif membership == Membership.JOIN:
+            self.members.add(user_id)
 
             if event.content.displayname is not None:
-                self.displaynames[event.state_key] = str(event.content.displayname)
-            elif event.state_key in self.displaynames:
-                del self.displaynames[event.state_key]
+                self.displaynames[user_id] = str(event.content.displayname)
+            else:
+                self.displaynames.pop(user_id, None)
+
+    async def _on_mx_room_power_levels(self, event: "StateEvent") -> None:
+        self._power_levels_users = dict(event.content.users)
 
     async def _join(self, user_id: "UserID", nick=None):
-        await self.az.intent.user(user_id).ensure_joined(self.id, ignore_cache=True)
+        await self._get_intent(user_id).ensure_joined(self.id, ignore_cache=True)
 
-        self.members.append(user_id)
+        self.members.add(user_id)
         if nick is not None:
             self.displaynames[user_id] = nick
 
+    def _get_intent(self, user_id: Optional["UserID"]) -> "IntentAPI":
+        if not user_id:
+            return self.az.intent
+
+        intent = self._intents.get(user_id)
+        if intent is None:
+            intent = self._intents[user_id] = self.az.intent.user(user_id)
+        return intent
+
     async def _flush_events(self, events: Iterable[dict]):
+        # Intents are only reused within a batch so departed puppets don't pile up
+        self._intents = {}
+
+        concurrent = []
+        groups = {}
+        group_kind = None
+        for event in self._coalesce_permissions(events):
+            if event["type"] in CONCURRENT_EVENT_TYPES:
+                concurrent.append(event)
+                continue
+
+            kind, key = self._flush_group(event)
+
+            # Anything else may depend on ordering, finish the pending groups first
+            if (concurrent or groups) and (kind is None or kind != group_kind):
+                await self._flush_concurrent(concurrent, groups)
+                concurrent = []
+                groups = {}
+                group_kind = None
+
+            if kind is not None:
+                group_kind = kind
+                groups.setdefault(key, []).append(event)
+                continue
+
+            try:
+                await self._flush_event(event)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self._log_flush_error(event, e)
+
+        if concurrent or groups:
+            await self._flush_concurrent(concurrent, groups)
+
+    async def _flush_sequential(self, events: list[dict]):
         for event in events:
             try:
                 await self._flush_event(event)
-            except Exception:
-                logging.exception("Queued event failed")
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self._log_flush_error(event, e)
 
-    async def _flush_event(self, event: dict):
-        if event["type"] == "_join":
-            if event["user_id"] not in self.members:
-                await self._join(event["user_id"], event["nick"])
-        elif event["type"] == "_leave":
-            if self.lazy_members is not None and event["user_id"] in self.lazy_members:
-                del self.lazy_members[event["user_id"]]
-
-            if event["user_id"] in self.members:
-                if event["reason"] is not None:
-                    await self.az.intent.user(event["user_id"]).kick_user(
-                        self.id, event["user_id"], event["reason"]
+    async def _flush_concurrent(self, events: list[dict], groups: dict[str, list]):
+        # don't flood the homeserver when a whole stream's members sync at once
+        semaphore = asyncio.Semaphore(16)
+
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+
+        results = await asyncio.gather(
+            *(limited(self._flush_event(event)) for event in events),
+            *(limited(self._flush_sequential(group)) for group in groups.values()),
+            return_exceptions=True,
+        )
+        for event, result in zip(events, results):
+            if isinstance(result, Exception):
+                self._log_flush_error(event, result)
+
+    def _flush_group(self, event: dict) -> tuple[Optional[str], Optional[str]]:
+        """Find which events a queued event only needs to stay in order with
+
+        Consecutive events of the same kind are flushed concurrently across keys
+        and in order within a key. Events without a kind are barriers, everything
+        queued before them is sent first.
+
+        Stream messages are keyed by topic, so messages in one topic keep their
+        order whoever sent them, while messages in different topics of a batch
+        may land in any order. Each topic is its own Matrix thread, so threads
+        read in Zulip's order and only the flat room timeline can interleave
+        differently.
+
+        Args:
+            event (dict): Queued event
+
+        Returns:
+            tuple[Optional[str], Optional[str]]: Kind and key, or None, None if the
+            event has to be ordered against everything else
+        """
+        match event["type"]:
+            case "_join" | "_leave" | "_kick":
+                return "member", event["user_id"]
+            case "_ensure_zulip_user_id":
+                zulip_user_id = event.get("zulip_user_id")
+                if zulip_user_id is None and event.get("zulip_user"):
+                    zulip_user_id = event["zulip_user"].get("user_id")
+                # without a user the event is flushed on its own and logs its error
+                if zulip_user_id is not None:
+                    return "member", self.serv.get_mxid_from_zulip_user_id(
+                        event["organization"], zulip_user_id
                     )
-                else:
-                    await self.az.intent.user(event["user_id"]).leave_room(self.id)
-                if event["user_id"] in self.members:
-                    self.members.remove(event["user_id"])
-                if event["user_id"] in self.displaynames:
-                    del self.displaynames[event["user_id"]]
-
-        elif event["type"] == "_kick":
-            if event["user_id"] in self.members:
-                await self.az.intent.kick_user(
-                    self.id, event["user_id"], event["reason"]
-                )
-                self.members.remove(event["user_id"])
-                if event["user_id"] in self.displaynames:
-                    del self.displaynames[event["user_id"]]
-        elif event["type"] == "_ensure_zulip_user_id":
-            await self.serv.ensure_zulip_user_id(
-                event["organization"],
-                zulip_user_id=event["zulip_user_id"],
-                zulip_user=event["zulip_user"],
-            )
-        elif event["type"] == "_redact":
-            await self.az.intent.redact(
-                room_id=self.id,
-                event_id=event["event_id"],
-                reason=event["reason"],
-            )
-        elif event["type"] == "_permission":
-            if len(event["content"]["users"]) == 0:
-                return  # No need to send an empty event
-            try:
-                await self.az.intent.set_power_levels(
-                    room_id=self.id,
-                    content=event["content"],
-                )
-            except IntentError:
-                pass
-        elif "state_key" in event:
-            intent = self.az.intent
-
-            if event["user_id"]:
-                intent = intent.user(event["user_id"])
-
-            await intent.send_state_event(
-                self.id,
-                EventType.find(event["type"]),
-                state_key=event["state_key"],
-                content=event["content"],
-            )
+            case "m.room.message":
+                # Stream messages only need to stay in order within their topic
+                bridge_data = event["content"].get("lv.shema.zulipbridge")
+                if bridge_data is not None and bridge_data.get("target") == "stream":
+                    return "topic", bridge_data.get("zulip_topic")
+
+        return None, None
+
+    @staticmethod
+    def _log_flush_error(event: dict, e: Exception):
+        # Homeserver errors are expected during outages, skip the traceback for them
+        if isinstance(e, (MatrixRequestError, MatrixConnectionError)):
+            logging.warning(f"Queued {event['type']} event failed: {e}")
         else:
-            bridge_data = event["content"].get("lv.shema.zulipbridge")
-            if bridge_data is None:
-                bridge_data = {}
+            logging.error("Queued event failed", exc_info=e)
+
+    @staticmethod
+    def _coalesce_permissions(events: Iterable[dict]) -> list[dict]:
+        """Merge consecutive power level changes into one
 
+        Any other event in between keeps the changes on either side apart, so
+        nothing is sent with power levels from later in the batch. Queued events
+        are left untouched, merged changes get a new event.
+
+        Args:
+            events (Iterable[dict]): Queued events
+
+        Returns:
+            list[dict]: Events without back-to-back _permission events
+        """
+        coalesced = []
+        for event in events:
             if (
-                bridge_data.get("type") == "message"
-                and bridge_data.get("target") == "stream"
+                event["type"] == "_permission"
+                and coalesced
+                and coalesced[-1]["type"] == "_permission"
             ):
-                thread_id = self.threads.get(bridge_data["zulip_topic"])
-                if thread_id is None:
-                    logging.error(
-                        f"Thread not created for topic: {bridge_data['zulip_topic']}"
-                    )
-                    return
-                event["content"]["m.relates_to"] = {
-                    "event_id": thread_id,
-                    "rel_type": "m.thread",
-                }
-                # https://spec.matrix.org/v1.9/client-server-api/#fallback-for-unthreaded-clients
-                if thread_id in self.thread_last_message:
-                    event["content"]["m.relates_to"]["is_falling_back"] = True
-                    event["content"]["m.relates_to"]["m.in_reply_to"] = {
-                        "event_id": self.thread_last_message[thread_id]
-                    }
-
-            if bridge_data.get("reply_to") is not None:
-                if "m.relates_to" not in event["content"]:
-                    event["content"]["m.relates_to"] = {}
-                event["content"]["m.relates_to"]["is_falling_back"] = False
-                event["content"]["m.relates_to"]["m.in_reply_to"] = {
-                    "event_id": bridge_data.get("reply_to")
-                }
+                users = coalesced[-1]["content"]["users"] | event["content"]["users"]
+                coalesced[-1] = {"type": "_permission", "content": {"users": users}}
+            else:
+                coalesced.append(event)
+        return coalesced
+
+    async def _flush_event(self, event: dict):
+        handler = self._FLUSH_HANDLERS.get(event["type"])
+        if handler is not None:
+            await handler(self, event)
+        else:
+            await self._flush_default(event)
+
+    async def _flush_join(self, event: dict):
+        if event["user_id"] not in self.members:
+            await self._join(event["user_id"], event["nick"])
 
-            intent = (
-                self.az.intent.user(event["user_id"])
-                if event["user_id"]
-                else self.az.intent
+    async def _flush_leave(self, event: dict):
+        user_id = event["user_id"]
+        if self.lazy_members is not None:
+            self.lazy_members.pop(user_id, None)
+
+        if user_id in self.members:
+            if event["reason"] is not None:
+                await self._get_intent(user_id).kick_user(
+                    self.id, user_id, event["reason"]
+                )
+            else:
+                await self._get_intent(user_id).leave_room(self.id)
+            self.members.discard(user_id)
+            self.displaynames.pop(user_id, None)
+
+    async def _flush_kick(self, event: dict):
+        user_id = event["user_id"]
+        if user_id in self.members:
+            await self.az.intent.kick_user(self.id, user_id, event["reason"])
+            # membership events may have removed the user while we waited
+            self.members.discard(user_id)
+            self.displaynames.pop(user_id, None)
+
+    async def _flush_ensure_zulip_user_id(self, event: dict):
+        await self.serv.ensure_zulip_user_id(
+            event["organization"],
+            zulip_user_id=event["zulip_user_id"],
+            zulip_user=event["zulip_user"],
+        )
+
+    async def _flush_redact(self, event: dict):
+        await self.az.intent.redact(
+            room_id=self.id,
+            event_id=event["event_id"],
+            reason=event["reason"],
+        )
+
+    async def _flush_permission(self, event: dict):
+        if len(event["content"]["users"]) == 0:
+            return  # No need to send an empty event
+        try:
+            await self.az.intent.set_power_levels(
+                room_id=self.id,
+                content=event["content"],
             )
+        except IntentError:
+            self._power_levels_users = None
+        else:
+            self._power_levels_users = event["content"]["users"]
 
-            if "zulip_user_id" in bridge_data and "display_name" in bridge_data:
-                # TODO: Check if the display name is already cached
-                await intent.set_displayname(bridge_data["display_name"])
+    async def _flush_default(self, event: dict):
+        if "state_key" in event:
+            await self._flush_state(event)
+        else:
+            await self._flush_message(event)
 
-            # Remove bridge data before sending it to Matrix
-            # This saves a few bytes!
-            event["content"].pop("lv.shema.zulipbridge", None)
+    async def _flush_state(self, event: dict):
+        intent = self._get_intent(event["user_id"])
 
-            timestamp = None
-            if "timestamp" in bridge_data:
-                timestamp = bridge_data["timestamp"] * 1000
+        await intent.send_state_event(
+            self.id,
+            _find_event_type(event["type"]),
+            state_key=event["state_key"],
+            content=event["content"],
+        )
 
-            event_type = EventType.find(event["type"])
+    async def _flush_message(self, event: dict):
+        content = event["content"]
+        user_id = event["user_id"]
 
-            # Skip creating a new thread if it already exists
-            if (
-                bridge_data.get("type") == "topic"
-                and bridge_data["zulip_topic"] in self.threads
-            ):
+        # Remove bridge data before sending it to Matrix
+        # This saves a few bytes!
+        bridge_data = content.pop("lv.shema.zulipbridge", None) or {}
+        bridge_type = bridge_data.get("type")
+
+        if bridge_type == "message" and bridge_data.get("target") == "stream":
+            thread_id = self.threads.get(bridge_data["zulip_topic"])
+            if thread_id is None:
+                logging.error(
+                    f"Thread not created for topic: {bridge_data['zulip_topic']}"
+                )
                 return
+            relates_to = content["m.relates_to"] = {
+                "event_id": thread_id,
+                "rel_type": "m.thread",
+            }
+            # https://spec.matrix.org/v1.9/client-server-api/#fallback-for-unthreaded-clients
+            last_message = self.thread_last_message.get(thread_id)
+            if last_message is not None:
+                relates_to["is_falling_back"] = True
+                relates_to["m.in_reply_to"] = {"event_id": last_message}
+
+        reply_to = bridge_data.get("reply_to")
+        if reply_to is not None:
+            relates_to = content.setdefault("m.relates_to", {})
+            relates_to["is_falling_back"] = False
+            relates_to["m.in_reply_to"] = {"event_id": reply_to}
+
+        intent = self._get_intent(user_id)
+
+        if "zulip_user_id" in bridge_data and "display_name" in bridge_data:
+            # Only hits the homeserver when the cached display name differs
+            await self.serv.cache_user(user_id, bridge_data["display_name"])
+
+        timestamp = None
+        if "timestamp" in bridge_data:
+            timestamp = bridge_data["timestamp"] * 1000
+
+        # Skip creating a new thread if it already exists
+        if bridge_type == "topic" and bridge_data["zulip_topic"] in self.threads:
+            return
+
+        event_id = await intent.send_message_event(
+            self.id,
+            _find_event_type(event["type"]),
+            content,
+            timestamp=timestamp,
+        )
 
-            event_id = await intent.send_message_event(
-                self.id,
-                event_type,
-                event["content"],
-                timestamp=timestamp,
-            )
-            if (
-                "m.relates_to" in event["content"]
-                and event["content"]["m.relates_to"].get("rel_type") == "m.thread"
-            ):
-                self.thread_last_message[
-                    event["content"]["m.relates_to"]["event_id"]
-                ] = event_id
-
-            match bridge_data.get("type"):
-                case "message":
-                    # Is this efficient?
-                    self.messages[str(bridge_data["zulip_message_id"])] = event_id
-                    await self.save()
-
-                    if self.send_read_receipt and self.organization.zulip is not None:
-                        # Send read receipt to Zulip
-                        self.organization.zulip.update_message_flags(
-                            {
-                                "messages": [bridge_data["zulip_message_id"]],
-                                "op": "add",
-                                "flag": "read",
-                            }
-                        )
-
-                case "topic":
-                    self.threads[bridge_data["zulip_topic"]] = event_id
-                    await self.save()
+        relates_to = content.get("m.relates_to")
+        if relates_to is not None and relates_to.get("rel_type") == "m.thread":
+            self.thread_last_message[relates_to["event_id"]] = event_id
+
+        match bridge_type:
+            case "message":
+                # Is this efficient?
+                self.messages[str(bridge_data["zulip_message_id"])] = event_id
+                self.save_later()
+
+                if self.send_read_receipt and self.organization.zulip is not None:
+                    # Send read receipt to Zulip
+                    self.organization.mark_read(bridge_data["zulip_message_id"])
+
+            case "topic":
+                self.threads[bridge_data["zulip_topic"]] = event_id
+                self.save_later()
+
+    _FLUSH_HANDLERS: dict[str, Callable[["Room", dict], Awaitable[None]]] = {
+        "_join": _flush_join,
+        "_leave": _flush_leave,
+        "_kick": _flush_kick,
+        "_ensure_zulip_user_id": _flush_ensure_zulip_user_id,
+        "_redact": _flush_redact,
+        "_permission": _flush_permission,
+    }
+
+    @staticmethod
+    def _build_message_event(
+        msgtype: str,
+        text: str,
+        user_id: Optional["UserID"] = None,
+        formatted: Optional[str] = None,
+        fallback_html: Optional[str] = None,
+    ) -> dict:
+        content = {"msgtype": msgtype, "body": text}
+
+        if formatted:
+            content["format"] = "org.matrix.custom.html"
+            content["formatted_body"] = formatted
+
+        return {
+            "type": "m.room.message",
+            "content": content,
+            "user_id": user_id,
+            "fallback_html": fallback_html,
+        }
 
     # send message to mx user (may be puppeted)
     def send_message(
@@ -383,28 +608,12 @@ class Room(ABC):
         thread_id: Optional[str] = None,
         custom_data: Optional[dict] = None,
     ) -> None:
-        if formatted:
-            event = {
-                "type": "m.room.message",
-                "content": {
-                    "msgtype": "m.text",
-                    "format": "org.matrix.custom.html",
-                    "body": text,
-                    "formatted_body": formatted,
-                },
-                "user_id": user_id,
-                "fallback_html": fallback_html,
-            }
-        else:
-            event = {
-                "type": "m.room.message",
-                "content": {
-                    "msgtype": "m.text",
-                    "body": text,
-                },
-                "user_id": user_id,
-                "fallback_html": fallback_html,
-            }
+        if not text and not formatted:
+            return
+
+        event = self._build_message_event(
+            "m.text", text, user_id, formatted, fallback_html
+        )
 
         if thread_id:
             event["content"]["m.relates_to"] = {
@@ -415,10 +624,13 @@ class Room(ABC):
         if custom_data is not None:
             event["content"]["lv.shema.zulipbridge"] = custom_data
 
-        if "lv.shema.zulipbridge" in event["content"]:
-            bridge_data: dict = event["content"]["lv.shema.zulipbridge"]
-            if bridge_data["type"] == "message" and bridge_data["target"] == "stream":
-                self._ensure_thread_for_topic(bridge_data.copy(), user_id)
+            if (
+                custom_data["type"] == "message"
+                and custom_data["target"] == "stream"
+                # Only copy the bridge data when a new thread is needed
+                and custom_data["zulip_topic"] not in self.threads
+            ):
+                self._ensure_thread_for_topic(custom_data.copy(), user_id)
 
         self._queue.enqueue(event)
 
@@ -457,15 +669,12 @@ class Room(ABC):
         user_id: Optional["UserID"] = None,
         fallback_html: Optional[str] = None,
     ) -> None:
-        event = {
-            "type": "m.room.message",
-            "content": {
-                "msgtype": "m.emote",
-                "body": text,
-            },
-            "user_id": user_id,
-            "fallback_html": fallback_html,
-        }
+        if not text:
+            return
+
+        event = self._build_message_event(
+            "m.emote", text, user_id, fallback_html=fallback_html
+        )
 
         self._queue.enqueue(event)
 
@@ -477,43 +686,22 @@ class Room(ABC):
         formatted: str = None,
         fallback_html: Optional[str] = None,
     ) -> None:
-        if formatted:
-            event = {
-                "type": "m.room.message",
-                "content": {
-                    "msgtype": "m.notice",
-                    "format": "org.matrix.custom.html",
-                    "body": text,
-                    "formatted_body": formatted,
-                },
-                "user_id": user_id,
-                "fallback_html": fallback_html,
-            }
-        else:
-            event = {
-                "type": "m.room.message",
-                "content": {
-                    "msgtype": "m.notice",
-                    "body": text,
-                },
-                "user_id": user_id,
-                "fallback_html": fallback_html,
-            }
+        if not text and not formatted:
+            return
+
+        event = self._build_message_event(
+            "m.notice", text, user_id, formatted, fallback_html
+        )
 
         self._queue.enqueue(event)
 
     # send notice to mx user (may be puppeted)
     def send_notice_html(self, text: str, user_id: Optional["UserID"] = None) -> None:
-        event = {
-            "type": "m.room.message",
-            "content": {
-                "msgtype": "m.notice",
-                "body": re.sub("<[^<]+?>", "", text),
-                "format": "org.matrix.custom.html",
-                "formatted_body": text,
-            },
-            "user_id": user_id,
-        }
+        if not text:
+            return
+
+        body = _STRIP_TAGS_RE.sub("", text) if "<" in text else text
+        event = self._build_message_event("m.notice", body, user_id, text)
 
         self._queue.enqueue(event)
 
@@ -604,16 +792,25 @@ class Room(ABC):
         self._queue.enqueue(event)
 
     async def sync_permissions(self, permissions: dict):
-        room_power_levels = await self.az.intent.get_power_levels(
-            self.id, ensure_joined=False
-        )
+        if not permissions:
+            return
+
+        # Power levels we last saw are enough to tell that nothing needs changing
+        current = self._power_levels_users
+        if current is None or any(current.get(k) != v for k, v in permissions.items()):
+            room_power_levels = await self.az.intent.get_power_levels(
+                self.id, ensure_joined=False
+            )
+            current = self._power_levels_users = dict(room_power_levels.users)
 
-        permissions = room_power_levels.users | permissions
+        changed = {k: v for k, v in permissions.items() if current.get(k) != v}
 
-        if permissions == room_power_levels.users:
-            logging.debug(f"Nothing chnaged: {permissions=}")
+        if not changed:
+            logging.debug(f"Nothing changed: {permissions=}")
             return  # Nothing changed
 
+        permissions = current | changed
+
         self._queue.enqueue(
             {
                 "type": "_permission",
@@ -38,6 +38,8 @@ if TYPE_CHECKING:
 
 
 class SpaceRoom(UnderOrganizationRoom):
+    __slots__ = ("name", "pending")
+
     name: str
 
     # pending rooms to attach during space creation
@@ -82,6 +84,10 @@ class SpaceRoom(UnderOrganizationRoom):
         return room
 
     async def create_finalize(self) -> None:
+        # attach rooms we already know about as part of the initial state,
+        # they stay pending until the space exists in case creation fails
+        initial_rooms = dict.fromkeys([self.organization.id, *self.pending])
+
         resp = await self.az.intent.api.request(
             Method.POST,
             Path.v3.createRoom,
@@ -97,9 +103,10 @@ class SpaceRoom(UnderOrganizationRoom):
                 "initial_state": [
                     {
                         "type": "m.space.child",
-                        "state_key": self.organization.id,
+                        "state_key": room_id,
                         "content": {"via": [self.organization.serv.server_name]},
                     }
+                    for room_id in initial_rooms
                 ],
                 "power_level_content_override": {
                     "events_default": 50,
@@ -122,12 +129,18 @@ class SpaceRoom(UnderOrganizationRoom):
         self.serv.register_room(self)
         await self.save()
 
-        # attach all pending rooms
         rooms = self.pending
         self.pending = []
 
+        # rooms detached while the space was being created were still added
+        for room_id in initial_rooms:
+            if room_id != self.organization.id and room_id not in rooms:
+                await self.detach(room_id)
+
+        # attach rooms that were queued while the space was being created
         for room_id in rooms:
-            await self.attach(room_id)
+            if room_id not in initial_rooms:
+                await self.attach(room_id)
 
     def cleanup(self) -> None:
         try:
@@ -23,13 +23,13 @@
 #
 import asyncio
 import logging
+import sys
 from typing import TYPE_CHECKING, Optional
 
 from mautrix.errors import MBadState
-from mautrix.types import MessageType
 
 from matrixzulipbridge.command_parse import CommandParser
-from matrixzulipbridge.direct_room import DirectRoom
+from matrixzulipbridge.direct_room import RELAYED_MSGTYPES, DirectRoom
 from matrixzulipbridge.room import InvalidConfigError
 from matrixzulipbridge.under_organization_room import connected
 
@@ -176,12 +176,12 @@ class StreamRoom(DirectRoom):
             [organization.user_id, organization.serv.user_id],
             [],
         )
-        room.name = name.lower()
+        room.name = sys.intern(name.lower())
         room.organization = organization
         room.organization_id = organization.id
         room.max_backfill_amount = backfill or organization.max_backfill_amount
 
-        result = organization.zulip.get_stream_id(name)
+        result = await organization.zulip_call(organization.zulip.get_stream_id, name)
         room.stream_id = result.get("stream_id")
 
         if not room.stream_id:
@@ -198,11 +198,12 @@ class StreamRoom(DirectRoom):
 
         organization.serv.register_room(room)
         organization.rooms[room.stream_id] = room
+        organization.rooms_by_name[room.name] = room
 
         if room_id is not None:
             asyncio.ensure_future(room.join_existing_room(room_id))
         else:
-            asyncio.ensure_future(room.create_mx(name))
+            asyncio.get_running_loop().create_task(room.create_mx(name))
 
         return room
 
@@ -238,15 +239,18 @@ class StreamRoom(DirectRoom):
             self.topic_sync = config["topic_sync"]
 
     def to_config(self) -> dict:
-        return {
-            **(super().to_config()),
-            "key": self.key,
-            "member_sync": self.member_sync,
-            "stream_id": self.stream_id,
-            "use_displaynames": self.use_displaynames,
-            "allow_notice": self.allow_notice,
-            "topic_sync": self.topic_sync,
-        }
+        config = super().to_config()
+        config.update(
+            {
+                "key": self.key,
+                "member_sync": self.member_sync,
+                "stream_id": self.stream_id,
+                "use_displaynames": self.use_displaynames,
+                "allow_notice": self.allow_notice,
+                "topic_sync": self.topic_sync,
+            }
+        )
+        return config
 
     async def create_mx(self, name: str):
         # handle !room names properly
@@ -254,8 +258,10 @@ class StreamRoom(DirectRoom):
         if visible_name.startswith("!"):
             visible_name = "!" + visible_name[6:]
 
-        result = self.organization.zulip.call_endpoint(
-            url=f"/streams/{self.stream_id}", method="get"
+        result = await self.organization.zulip_call(
+            self.organization.zulip.call_endpoint,
+            url=f"/streams/{self.stream_id}",
+            method="get",
         )
         if result["result"] != "success":
             self.send_notice(f"Could not get stream by id: {result}")
@@ -294,26 +300,19 @@ class StreamRoom(DirectRoom):
     @connected
     async def on_mx_message(self, event: "MessageEvent") -> None:
         sender = str(event.sender)
-        (name, server) = sender.split(":", 1)
 
         # ignore self messages
         if sender == self.serv.user_id:
             return
 
         # prevent re-sending federated messages back
-        if (
-            name.startswith("@" + self.serv.puppet_prefix)
-            and server == self.serv.server_name
-        ):
+        if self.serv.is_puppet(sender):
             return
 
         sender = f"[{self._get_displayname(sender)}](https://matrix.to/#/{sender})"
 
-        if event.content.msgtype.is_media or event.content.msgtype in (
-            MessageType.EMOTE,
-            MessageType.TEXT,
-            MessageType.NOTICE,
-        ):
+        msgtype = event.content.msgtype
+        if msgtype.is_media or msgtype in RELAYED_MSGTYPES:
             await self._relay_message(event, sender)
 
         await self.az.intent.send_receipt(event.room_id, event.event_id)
@@ -325,39 +324,24 @@ class StreamRoom(DirectRoom):
             client = self.organization.zulip
             prefix = f"<{sender}> "
 
-        # try to find out if this was a reply
-        reply_to = None
-        if event.content.get_reply_to():
-            rel_event = event
-
-            # traverse back all edits
-            while rel_event.content.get_edit():
-                rel_event = await self.az.intent.get_event(
-                    self.id, rel_event.content.get_edit()
-                )
-
-            # see if the original is a reply
-            if rel_event.content.get_reply_to():
-                reply_to = await self.az.intent.get_event(
-                    self.id, rel_event.content.get_reply_to()
-                )
-
         # Get topic (Matrix thread)
         thread_id = event.content.get_thread_parent()
         # Ignore messages outside a thread
         if thread_id is None:
             return
 
-        thread_event = await self.az.intent.get_event(self.id, thread_id)
-        topic = thread_event.content.body
-
         # Save last thread event for old clients
         self.thread_last_message[thread_id] = event.event_id
 
-        if thread_id in self.threads.inv:
-            topic = self.threads.inv[thread_id]
+        topic = self.threads.inv.get(thread_id)
+        if topic is not None:
+            # try to find out if this was a reply
+            reply_to = await self._get_reply_to(event)
         else:
-            thread_event = await self.az.intent.get_event(self.id, thread_id)
+            # look up the thread root while resolving the reply
+            reply_to, thread_event = await asyncio.gather(
+                self._get_reply_to(event), self.az.intent.get_event(self.id, thread_id)
+            )
             topic = thread_event.content.body
             self.threads[topic] = thread_id
 
@@ -374,15 +358,13 @@ class StreamRoom(DirectRoom):
             "content": message,
         }
 
-        result = client.send_message(request)
+        result = await self.organization.zulip_call(client.send_message, request)
         if result["result"] != "success":
             logging.error(f"Failed sending message to Zulip: {result['msg']}")
             return
 
         self.messages[str(result["id"])] = event.event_id
-        await self.save()
-
-        await self.save()
+        self.save_later()
 
     @connected
     async def on_mx_ban(self, user_id: "UserID") -> None:
@@ -396,7 +378,9 @@ class StreamRoom(DirectRoom):
         if zulip_user_id in self.organization.deactivated_users:
             return
 
-        result = self.organization.zulip.deactivate_user_by_id(zulip_user_id)
+        result = await self.organization.zulip_call(
+            self.organization.zulip.deactivate_user_by_id, zulip_user_id
+        )
         if result["result"] != "success":
             self.organization.send_notice(
                 f"Unable to deactivate {user_id}: {result['msg']}"
@@ -432,7 +416,9 @@ class StreamRoom(DirectRoom):
         if zulip_user_id not in self.organization.deactivated_users:
             return
 
-        result = self.organization.zulip.reactivate_user_by_id(zulip_user_id)
+        result = await self.organization.zulip_call(
+            self.organization.zulip.reactivate_user_by_id, zulip_user_id
+        )
         if result["result"] != "success":
             self.organization.send_notice(
                 f"Unable to reactivate {user_id}: {result['msg']}"
@@ -522,7 +508,7 @@ class StreamRoom(DirectRoom):
 
         self.leave(user_id, reason)
 
-    def on_join(
+    async def on_join(
         self, zulip_user_id: "ZulipUserID" = None, zulip_user: dict = None
     ) -> None:
         if zulip_user_id is None:
@@ -531,7 +517,7 @@ class StreamRoom(DirectRoom):
         if zulip_user_id == self.organization.profile["user_id"]:
             return
         if zulip_user is None:
-            zulip_user = self.organization.get_zulip_user(zulip_user_id)
+            zulip_user = await self.organization.get_zulip_user(zulip_user_id)
 
         # ensure, append, invite and join
         self._add_puppet(zulip_user)
@@ -551,21 +537,14 @@ class StreamRoom(DirectRoom):
         self._remove_puppet(mx_user_id)
 
     async def sync_zulip_members(self, subscribers: list["ZulipUserID"]):
-        to_remove = []
         to_add = []
 
         # always reset lazy list because it can be toggled on-the-fly
         self.lazy_members = {} if self.member_sync != "off" else None
 
         # build to_remove list from our own puppets
-        for member in self.members:
-            (name, server) = member.split(":", 1)
-
-            if (
-                name.startswith("@" + self.serv.puppet_prefix)
-                and server == self.serv.server_name
-            ):
-                to_remove.append(member)
+        is_puppet = self.serv.is_puppet
+        to_remove = {member for member in self.members if is_puppet(member)}
 
         for zulip_user_id in subscribers:
             # convert to mx id, check if we already have them
@@ -591,13 +570,11 @@ class StreamRoom(DirectRoom):
                 self.lazy_members[mx_user_id] = zulip_user_id
 
         # never remove us or appservice
-        if self.serv.user_id in to_remove:
-            to_remove.remove(self.serv.user_id)
-        if self.user_id in to_remove:
-            to_remove.remove(self.user_id)
+        to_remove.discard(self.serv.user_id)
+        to_remove.discard(self.user_id)
 
         for mx_user_id, zulip_user_id in to_add:
-            zulip_user = self.organization.get_zulip_user(zulip_user_id)
+            zulip_user = await self.organization.get_zulip_user(zulip_user_id)
 
             self._add_puppet(zulip_user)
 
@@ -616,15 +593,18 @@ class StreamRoom(DirectRoom):
                 {"operator": "stream", "operand": self.stream_id},
             ],
         }
-        result = self.organization.zulip.get_messages(request)
+        result = await self.organization.zulip_call(
+            self.organization.zulip.get_messages, request
+        )
 
         if result["result"] != "success":
             logging.error(f"Failed getting Zulip messages: {result['msg']}")
             return
 
+        organization = self.organization
+        backfill = organization.zulip_handler.backfill_message
         for message in result["messages"]:
-            if str(message["id"]) in self.messages:
-                continue
-            if str(message["id"]) in self.organization.messages:
+            message_id = str(message["id"])
+            if message_id in self.messages or message_id in organization.messages:
                 continue
-            self.organization.zulip_handler.backfill_message(message)
+            backfill(message)
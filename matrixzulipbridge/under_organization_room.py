@@ -21,7 +21,7 @@
 # [This file includes modifications made by Emma Meijere]
 #
 #
-import asyncio
+import functools
 import logging
 from typing import TYPE_CHECKING, Optional
 from urllib.parse import quote, urlparse
@@ -37,6 +37,7 @@ from mautrix.types.event.state import (
 )
 from mautrix.types.event.type import EventType
 
+from matrixzulipbridge.appservice import PRE_RESTRICTED_ROOM_VERSIONS
 from matrixzulipbridge.room import InvalidConfigError, Room
 
 if TYPE_CHECKING:
@@ -45,15 +46,23 @@ if TYPE_CHECKING:
     from matrixzulipbridge.organization_room import OrganizationRoom
 
 
+@functools.lru_cache(maxsize=1024)
+def _markdownify(html) -> str:
+    # people often send the same snippets, conversion is the costly part
+    return markdownify(html)
+
+
 def connected(f):
-    def wrapper(*args, **kwargs):
-        self = args[0]
+    @functools.wraps(f)
+    async def wrapper(self, *args, **kwargs):
+        organization = self.organization
+        client = organization.zulip if organization else None
 
-        if not self.organization.zulip or not self.organization.zulip.has_connected:
+        if client is None or not client.has_connected:
             self.send_notice("Need to be connected to use this command.")
-            return asyncio.sleep(0)
+            return None
 
-        return f(*args, **kwargs)
+        return await f(self, *args, **kwargs)
 
     return wrapper
 
@@ -61,6 +70,8 @@ def connected(f):
 class UnderOrganizationRoom(Room):
     """Base class for all rooms under an organization"""
 
+    __slots__ = ("organization", "organization_id", "force_forward")
+
     organization: Optional["OrganizationRoom"]
     organization_id: "RoomID"
     force_forward: bool
@@ -79,10 +90,9 @@ class UnderOrganizationRoom(Room):
             raise InvalidConfigError("No organization_id in config for room")
 
     def to_config(self) -> dict:
-        return {
-            **(super().to_config()),
-            "organization_id": self.organization_id,
-        }
+        config = super().to_config()
+        config["organization_id"] = self.organization_id
+        return config
 
     def is_valid(self) -> bool:
         if self.organization_id is None:
@@ -120,6 +130,9 @@ class UnderOrganizationRoom(Room):
                 mxc=event.content.url, filename=event.content.body
             )
             message = f"[{content.body}]({media_url})"
+        elif content.formatted_body and "<a" not in content.formatted_body:
+            # no mentions or reply links to rewrite, skip the extra parse
+            message = _markdownify(content.formatted_body)
         elif content.formatted_body:
             message = content.formatted_body
 
@@ -135,7 +148,7 @@ class UnderOrganizationRoom(Room):
                     continue
 
                 user_id = self.organization.get_zulip_user_id_from_mxid(mxid)
-                zulip_user = self.organization.get_zulip_user(user_id)
+                zulip_user = await self.organization.get_zulip_user(user_id)
 
                 zulip_mention = soup.new_tag("span")
                 zulip_mention.string = " @"
@@ -177,7 +190,7 @@ class UnderOrganizationRoom(Room):
 
             message = soup.encode(formatter="html5")
 
-            message = markdownify(message)
+            message = _markdownify(message)
         elif content.body:
             message = content.body
         else:
@@ -238,7 +251,7 @@ class UnderOrganizationRoom(Room):
             room_create = await self.az.intent.get_state_event(
                 self.id, EventType.ROOM_CREATE  # pylint: disable=no-member
             )  # pylint: disable=no-member
-            if room_create.room_version in [str(v) for v in range(1, 9)]:
+            if room_create.room_version in PRE_RESTRICTED_ROOM_VERSIONS:
                 self.send_notice(
                     "Only rooms of version 9 or greater can be attached to a space."
                 )
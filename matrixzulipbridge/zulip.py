@@ -21,11 +21,14 @@
 # [This file includes modifications made by Emma Meijere]
 #
 #
+import asyncio
+import json
 import logging
 import re
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 from urllib.parse import urljoin
 
+import aiohttp
 import emoji
 from bs4 import BeautifulSoup
 from markdownify import markdownify
@@ -36,23 +39,144 @@ from matrixzulipbridge.stream_room import StreamRoom
 from matrixzulipbridge.types import ZulipUserID
 
 if TYPE_CHECKING:
+    import zulip
+
     from matrixzulipbridge.organization_room import OrganizationRoom
     from matrixzulipbridge.types import ZulipMessageID, ZulipStreamID
 
+_NEAR_MESSAGE_RE = re.compile(r".*\/near\/(\d+)(\/|$)")
+
+
+class ZulipEventListener:
+    """Long-polls a Zulip event queue on the asyncio loop
+
+    Replaces the blocking zulip.Client.call_on_each_event, which pins a thread
+    per listener for its whole lifetime. The HTTP session is shared and owned
+    by the organization, credentials are sent per request.
+    """
+
+    # Zulip sends a heartbeat roughly every minute on an idle queue
+    TIMEOUT = aiohttp.ClientTimeout(total=None, sock_read=120)
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        client: "zulip.Client",
+        callback: Callable[[dict], Awaitable[None]],
+        **register_params,
+    ) -> None:
+        self.session = session
+        self.client = client
+        self.auth = aiohttp.BasicAuth(client.email, client.api_key)
+        self.callback = callback
+        self.register_params = register_params
+        self._task = None
+
+    def start(self) -> None:
+        """Start polling the event queue in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self) -> None:
+        """Stop polling, the Zulip queue is left to expire on the server"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _call(self, method: str, endpoint: str, params: dict) -> dict:
+        """Make an authenticated Zulip API request
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint relative to the client's base URL
+            params (dict): query parameters
+
+        Returns:
+            dict: decoded JSON response
+        """
+        async with self.session.request(
+            method,
+            self.client.base_url + endpoint,
+            params=params,
+            auth=self.auth,
+            timeout=self.TIMEOUT,
+        ) as resp:
+            return await resp.json(content_type=None)
+
+    async def _register(self) -> dict:
+        """Register a new event queue with the listener's parameters
+
+        Returns:
+            dict: Zulip register response
+        """
+        params = {k: json.dumps(v) for k, v in self.register_params.items()}
+        return await self._call("POST", "v1/register", params)
+
+    async def _loop(self) -> None:
+        """Poll the event queue and hand each event to the callback"""
+        queue_id = None
+        last_event_id = -1
+
+        while True:
+            try:
+                if queue_id is None:
+                    result = await self._register()
+                    if result["result"] != "success":
+                        logging.error(
+                            f"Registering Zulip event queue failed: {result['msg']}"
+                        )
+                        await asyncio.sleep(10)
+                        continue
+                    queue_id = result["queue_id"]
+                    last_event_id = result["last_event_id"]
+
+                result = await self._call(
+                    "GET",
+                    "v1/events",
+                    {"queue_id": queue_id, "last_event_id": last_event_id},
+                )
+                if result["result"] != "success":
+                    if result.get("code") == "BAD_EVENT_QUEUE_ID":
+                        logging.debug("Zulip event queue expired, re-registering")
+                        queue_id = None
+                    else:
+                        logging.error(f"Getting Zulip events failed: {result['msg']}")
+                        await asyncio.sleep(1)
+                    continue
+
+                for event in result["events"]:
+                    last_event_id = max(last_event_id, int(event["id"]))
+                    if event["type"] == "heartbeat":
+                        continue
+                    try:
+                        await self.callback(event)
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        logging.exception(f"Handling Zulip event failed: {event}")
+            except asyncio.CancelledError:
+                logging.debug("Zulip event listener was cancelled.")
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                logging.exception("Zulip event queue request failed, re-registering")
+                queue_id = None
+                await asyncio.sleep(5)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception("Zulip event listener failed, retrying")
+                await asyncio.sleep(5)
+
 
 class ZulipEventHandler:
     def __init__(self, organization: "OrganizationRoom") -> None:
         self.organization = organization
         self.messages = set()
 
-    def on_event(self, event: dict):
+    async def on_event(self, event: dict):
         logging.debug(f"Zulip event for {self.organization.name}: {event}")
         try:
             match event["type"]:
                 case "message":
                     self._handle_message(event["message"])
                 case "subscription":
-                    self._handle_subscription(event)
+                    await self._handle_subscription(event)
                 case "reaction":
                     self._handle_reaction(event)
                 case "delete_message":
@@ -119,6 +243,20 @@ class ZulipEventHandler:
             custom_data=custom_data,
         )
 
+    async def handle_dm_message_batch(self, events: list[dict]):
+        """Relay a batch of DM events, skipping duplicates
+
+        Args:
+            events (list[dict]): Zulip message events
+        """
+        # Each logged in recipient receives the same DM, only relay it once
+        seen = set()
+        for event in events:
+            if event["id"] in seen:
+                continue
+            seen.add(event["id"])
+            await self.handle_dm_message(event)
+
     async def handle_dm_message(self, event: dict):
         if event["sender_id"] == self.organization.profile["user_id"]:
             return  # Ignore own messages
@@ -213,7 +351,7 @@ class ZulipEventHandler:
         room.redact(message_mxid, reason="Deleted on Zulip")
         del room.messages[str(event["message_id"])]
 
-    def _handle_subscription(self, event: dict):
+    async def _handle_subscription(self, event: dict):
         if not "stream_ids" in event:
             return
         for stream_id in event["stream_ids"]:
@@ -228,7 +366,7 @@ class ZulipEventHandler:
             match event["op"]:
                 case "peer_add":
                     for user_id in event["user_ids"]:
-                        room.on_join(user_id)
+                        await room.on_join(user_id)
                 case "peer_remove":
                     for user_id in event["user_ids"]:
                         room.on_part(user_id)
@@ -315,7 +453,7 @@ class ZulipEventHandler:
             and "#narrow" in narrow_link.get("href", "")
         ):
             # Parse reply (crudely?)
-            message_id = re.match(r".*\/near\/(\d+)(\/|$)", narrow_link.get("href"))[1]
+            message_id = _NEAR_MESSAGE_RE.match(narrow_link.get("href"))[1]
             reply_event_id = room.messages.get(message_id)
 
             # Create rich reply fallback
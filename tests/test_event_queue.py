@@ -0,0 +1,83 @@
+# MatrixZulipBridge - an appservice puppeting bridge for Matrix - Zulip
+#
+# Copyright (C) 2024 Emma Meijere <emgh@em.id.lv>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# Originally licensed under the MIT (Expat) license:
+# <https://github.com/hifi/heisenbridge/blob/2532905f13835762870de55ba8a404fad6d62d81/LICENSE>.
+#
+# [This file includes modifications made by Emma Meijere]
+#
+#
+# pylint: skip-file
+import asyncio
+
+from matrixzulipbridge.event_queue import EventQueue
+
+
+def run_queue(feed, **kwargs):
+    batches = []
+
+    async def callback(events):
+        batches.append((asyncio.get_running_loop().time(), events))
+
+    async def run():
+        queue = EventQueue(callback, **kwargs)
+        queue.start()
+        started = asyncio.get_running_loop().time()
+        await feed(queue)
+        queue.stop()
+        return started
+
+    started = asyncio.run(run())
+    return [(at - started, events) for at, events in batches]
+
+
+def test_flush_at_max_size():
+    async def feed(queue):
+        for i in range(7):
+            queue.enqueue(i)
+        await asyncio.sleep(0.05)
+
+    batches = run_queue(feed, delay=10, max_wait=10, max_size=3)
+
+    assert [events for _, events in batches] == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_flush_at_max_wait():
+    # events keep arriving faster than the delay, only max_wait ends a batch
+    async def feed(queue):
+        for i in range(25):
+            queue.enqueue(i)
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.2)
+
+    batches = run_queue(feed, delay=0.1, max_wait=0.2, max_size=100)
+
+    assert len(batches) >= 2
+    assert batches[0][0] < 0.35
+    assert [i for _, events in batches for i in events] == list(range(25))
+
+
+def test_flush_after_delay():
+    async def feed(queue):
+        queue.enqueue(0)
+        queue.enqueue(1)
+        await asyncio.sleep(0.2)
+
+    batches = run_queue(feed, delay=0.05, max_wait=1, max_size=100)
+
+    assert [events for _, events in batches] == [[0, 1]]
+    assert batches[0][0] < 0.15
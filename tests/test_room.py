@@ -0,0 +1,219 @@
+# MatrixZulipBridge - an appservice puppeting bridge for Matrix - Zulip
+#
+# Copyright (C) 2024 Emma Meijere <emgh@em.id.lv>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# Originally licensed under the MIT (Expat) license:
+# <https://github.com/hifi/heisenbridge/blob/2532905f13835762870de55ba8a404fad6d62d81/LICENSE>.
+#
+# [This file includes modifications made by Emma Meijere]
+#
+#
+# pylint: skip-file
+import asyncio
+
+from matrixzulipbridge.room import Room
+
+
+class FakeIntent:
+    """Records homeserver calls in the order they complete"""
+
+    def __init__(self, log, user_id=None):
+        self.log = log
+        self.user_id = user_id
+
+    def user(self, user_id):
+        return FakeIntent(self.log, user_id)
+
+    async def _call(self, *entry, delay=0):
+        await asyncio.sleep(delay)
+        self.log.append(entry)
+
+    async def ensure_joined(self, room_id, ignore_cache=False):
+        await self._call("join", self.user_id)
+
+    async def leave_room(self, room_id):
+        await self._call("leave", self.user_id)
+
+    async def redact(self, room_id, event_id, reason=None):
+        await self._call("redact", event_id, delay=0.03)
+
+    async def set_power_levels(self, room_id, content):
+        await self._call("power_levels", dict(content["users"]))
+
+    async def send_state_event(self, room_id, event_type, state_key, content):
+        await self._call("state", content["name"])
+
+    async def send_message_event(self, room_id, event_type, content, timestamp=None):
+        # a per-message delay makes concurrently sent messages complete out of order
+        await self._call("message", content["body"], delay=content.get("delay", 0))
+        return f"${content['body']}"
+
+
+class FakeAppService:
+    def __init__(self, log):
+        self.intent = FakeIntent(log)
+
+
+class FakeRoom(Room):
+    def init(self):
+        self.messages = {}
+
+
+def flush(events):
+    log = []
+
+    async def run():
+        Room.init_class(FakeAppService(log))
+        room = FakeRoom("!room:example.org", "@owner:example.org", None, [], [])
+        room.cleanup()
+        await room._flush_events(events)
+
+    asyncio.run(run())
+    return log
+
+
+def message(body, topic, delay=0, user_id="@zulip_1:example.org"):
+    return {
+        "type": "m.room.message",
+        "content": {
+            "msgtype": "m.text",
+            "body": body,
+            "delay": delay,
+            "lv.shema.zulipbridge": {"target": "stream", "zulip_topic": topic},
+        },
+        "user_id": user_id,
+    }
+
+
+def state(name):
+    return {
+        "type": "m.room.name",
+        "content": {"name": name},
+        "state_key": "",
+        "user_id": None,
+    }
+
+
+def join(user_id, nick=None):
+    return {"type": "_join", "user_id": user_id, "nick": nick}
+
+
+def leave(user_id):
+    return {"type": "_leave", "user_id": user_id, "reason": None}
+
+
+def test_flush_keeps_order_within_a_key():
+    log = flush(
+        [
+            message("a1", "a", delay=0.03),
+            message("b1", "b", delay=0.02),
+            message("a2", "a", delay=0.01),
+            message("a3", "a"),
+        ]
+    )
+
+    a_messages = [entry[1] for entry in log if entry[1].startswith("a")]
+    assert a_messages == ["a1", "a2", "a3"]
+    assert len(log) == 4
+
+
+def test_flush_keeps_topic_order_across_senders():
+    log = flush(
+        [
+            message("a1", "a", delay=0.02, user_id="@zulip_1:example.org"),
+            message("b1", "b", user_id="@zulip_1:example.org"),
+            message("a2", "a", delay=0.01, user_id="@zulip_2:example.org"),
+            message("a3", "a", user_id="@zulip_3:example.org"),
+        ]
+    )
+
+    assert [entry[1] for entry in log if entry[1].startswith("a")] == [
+        "a1",
+        "a2",
+        "a3",
+    ]
+    # other topics are not held back by a slow one
+    assert log[0][1] == "b1"
+
+
+def test_flush_keeps_member_order_for_one_user():
+    log = flush(
+        [
+            join("@zulip_1:example.org"),
+            join("@zulip_2:example.org"),
+            leave("@zulip_1:example.org"),
+        ]
+    )
+
+    assert [e for e in log if e[1] == "@zulip_1:example.org"] == [
+        ("join", "@zulip_1:example.org"),
+        ("leave", "@zulip_1:example.org"),
+    ]
+
+
+def test_flush_orders_groups_around_barriers():
+    log = flush(
+        [
+            message("a1", "a", delay=0.02),
+            message("b1", "b", delay=0.01),
+            state("renamed"),
+            message("a2", "a"),
+            {"type": "_permission", "content": {"users": {"@owner:example.org": 100}}},
+            message("b2", "b"),
+        ]
+    )
+
+    order = [
+        entry[1] if entry[0] != "power_levels" else "power_levels" for entry in log
+    ]
+    assert set(order[:2]) == {"a1", "b1"}
+    assert order[2:] == ["renamed", "a2", "power_levels", "b2"]
+
+
+def test_flush_resets_grouping_after_a_barrier():
+    # the redaction is slow, a message grouped alongside it would overtake it
+    log = flush(
+        [
+            message("a1", "a"),
+            state("renamed"),
+            {"type": "_redact", "event_id": "$a1", "reason": None},
+            message("a2", "a"),
+        ]
+    )
+
+    assert [entry[1] for entry in log] == ["a1", "renamed", "$a1", "a2"]
+
+
+def permission(users):
+    return {"type": "_permission", "content": {"users": users}}
+
+
+def test_coalesce_permissions_merges_only_consecutive_changes():
+    first = permission({"@a:example.org": 50})
+    second = permission({"@a:example.org": 100, "@b:example.org": 50})
+    third = permission({"@c:example.org": 50})
+    member = join("@zulip_1:example.org")
+
+    events = Room._coalesce_permissions([first, member, second, third])
+
+    assert events[:2] == [first, member]
+    assert events[2] == permission(
+        {"@a:example.org": 100, "@b:example.org": 50, "@c:example.org": 50}
+    )
+    assert len(events) == 3
+    # queued events are not modified
+    assert second["content"]["users"] == {"@a:example.org": 100, "@b:example.org": 50}
+    assert third["content"]["users"] == {"@c:example.org": 50}